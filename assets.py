@@ -0,0 +1,205 @@
+import os
+import threading
+import pygame
+
+class _Asset:
+    def __init__(self, loader):
+        self.loader = loader
+        self.started = False
+        self.loaded = threading.Event()
+        self.value = None
+        self.error = None
+
+class AssetManager:
+    def __init__(self, cache_dir=os.path.join('.cache', 'audio'), audio=True):
+        """
+        Initializes the AssetManager.
+
+        Images, fonts and music are registered first and then loaded by `preload` in a
+        background thread, so the game can show its menu while the assets load. Every
+        asset is loaded once and the same handle is shared by all users. An asset
+        requested before the thread reached it is loaded right away on the calling thread.
+        If loading an asset fails, every request of it raises the error; music that could
+        not be decoded is streamed from its file instead.
+
+        Music is decoded into a `pygame.mixer.Sound` once. The decoded samples are
+        stored in `cache_dir`, so later starts skip the MP3 decoding entirely.
+
+        Args:
+            cache_dir (str): The directory for the decoded audio.
+            audio (bool): Whether music is loaded and played. Turn off when the mixer is not initialized.
+        """
+        self.cache_dir = cache_dir
+        self.audio = audio
+        self.music_paths = {}
+        self.music_channel = None
+        self.current_music = None
+        self._assets = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add_image(self, path):
+        """
+        Registers an image for preloading.
+
+        Args:
+            path (str): The path of the image.
+        """
+        self._register(('image', path), lambda: pygame.image.load(path))
+
+    def add_font(self, path, size):
+        """
+        Registers a font for preloading.
+
+        Args:
+            path (str): The path of the font file, or None for the default font.
+            size (int): The size of the font.
+        """
+        self._register(('font', path, size), lambda: pygame.font.Font(path, size))
+
+    def add_music(self, name, path):
+        """
+        Registers a music track for preloading and decoding.
+
+        Args:
+            name (str): The name used to play the track.
+            path (str): The path of the audio file.
+        """
+        self.music_paths[name] = path
+        if self.audio:
+            self._register(('music', name), lambda: self._decode(path))
+
+    def _register(self, key, loader):
+        with self._lock:
+            if key not in self._assets:
+                self._assets[key] = _Asset(loader)
+
+    def preload(self, progress=None):
+        """
+        Starts loading all registered assets in a background thread.
+
+        Args:
+            progress (callable): Optional callback called as progress(loaded, total, key) after every asset.
+
+        Returns:
+            threading.Thread: The loading thread.
+        """
+        keys = list(self._assets)
+        def run():
+            for count, key in enumerate(keys, 1):
+                self._load(key)
+                if progress is not None:
+                    progress(count, len(keys), key)
+        self._thread = threading.Thread(target=run, name='asset-preload', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def wait(self):
+        """
+        Blocks until the preloading thread has finished.
+        """
+        if self._thread is not None:
+            self._thread.join()
+
+    def _load(self, key):
+        asset = self._assets[key]
+        with self._lock:
+            claimed = not asset.started
+            asset.started = True
+        if claimed:
+            try:
+                asset.value = asset.loader()
+            except BaseException as error: # Stored, so the waiting threads raise it too
+                asset.error = error
+                if not isinstance(error, Exception): # E.g. KeyboardInterrupt, which must still stop this thread
+                    raise
+            finally:
+                asset.loaded.set() # Even if loading failed, so nobody waits forever
+        else:
+            asset.loaded.wait() # Another thread is loading it
+        return asset
+
+    def _get(self, key, loader):
+        self._register(key, loader)
+        asset = self._load(key)
+        if asset.error is not None:
+            raise asset.error
+        return asset.value
+
+    def image(self, path):
+        """
+        Returns the shared image loaded from the given path.
+
+        Args:
+            path (str): The path of the image.
+
+        Returns:
+            pygame.Surface: The image. It must not be modified.
+        """
+        return self._get(('image', path), lambda: pygame.image.load(path))
+
+    def font(self, path, size):
+        """
+        Returns the shared font with the given path and size.
+
+        Args:
+            path (str): The path of the font file, or None for the default font.
+            size (int): The size of the font.
+
+        Returns:
+            pygame.font.Font: The font.
+        """
+        return self._get(('font', path, size), lambda: pygame.font.Font(path, size))
+
+    def _decode(self, path):
+        frequency, size, channels = pygame.mixer.get_init()
+        stat = os.stat(path)
+        name = '%s-%d-%d-%d-%d-%d.raw' % (os.path.basename(path), stat.st_size, int(stat.st_mtime), frequency, size, channels)
+        cache_path = os.path.join(self.cache_dir, name)
+        if os.path.exists(cache_path): # Decoded before, just read the samples
+            with open(cache_path, 'rb') as file:
+                return pygame.mixer.Sound(buffer=file.read())
+        sound = pygame.mixer.Sound(path)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_path + '.tmp', 'wb') as file:
+                file.write(sound.get_raw())
+            os.replace(cache_path + '.tmp', cache_path)
+        except OSError:
+            pass # The cache is only an optimization
+        return sound
+
+    def play_music(self, name, loops=-1):
+        """
+        Plays the music track with the given name, stopping the current one.
+
+        If the track has not been decoded yet it is streamed from its file instead,
+        so playing never waits for the preloading thread. A track that is already
+        playing keeps playing.
+
+        Args:
+            name (str): The name of the track.
+            loops (int): The number of repeats, -1 loops forever.
+        """
+        if not self.audio or name == self.current_music:
+            return
+        self.stop_music()
+        asset = self._assets.get(('music', name))
+        if asset is not None and asset.loaded.is_set() and asset.value is not None:
+            self.music_channel = asset.value.play(loops=loops)
+        else:
+            pygame.mixer.music.load(self.music_paths[name])
+            pygame.mixer.music.play(loops)
+        self.current_music = name
+
+    def stop_music(self):
+        """
+        Stops the music.
+        """
+        if not self.audio:
+            return
+        if self.music_channel is not None:
+            self.music_channel.stop()
+            self.music_channel = None
+        pygame.mixer.music.stop()
+        self.current_music = None
@@ -1,47 +1,86 @@
+import math
 import pygame
 
 class Background:
-    def __init__(self):
+    def __init__(self, screen_width, screen_height, layers=None, load_image=pygame.image.load, time_scale=1.0):
         """
         Initializes the Background object.
 
-        Loads the background image, sets the initial position and movement speed.
+        Every layer image is loaded, converted to the display format and scaled to the
+        screen width once. Layers scrolling at the same speed are pre-composited into
+        one tall, seamless strip, so each frame costs a single area blit per distinct
+        speed (one blit for the default single layer).
 
         Parameters:
-        None
+        screen_width (int): The width of the screen.
+        screen_height (int): The height of the screen.
+        layers (list): Optional (image path, speed) pairs, back to front, with the speeds in pixels per tick at SETTINGS_TICK_RATE. The first layer should be opaque.
+        load_image (callable): Loads the image with the given path, e.g. from an asset manager.
+        time_scale (float): The game's speed scale, which converts the speeds of the layers to its tick rate.
 
         Returns:
         None
         """
-        self.image = pygame.image.load('pics/background.jpeg') # Load the background image
-        self.rect_bg = self.image.get_rect() # Get the rect of the background image
-        self.bg_Y = 0
-        self.bg_x = 0
-        self.bg_Y2 = -self.rect_bg.height
-        self.bg_x2 = 0
-        self.move_speed = 5
+        if layers is None:
+            layers = [('pics/background.jpeg', 5)] # Load the background image
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.load_image = load_image
+        layers = [(path, speed * time_scale) for path, speed in layers]
+        self.move_speed = layers[0][1]
+        self.scrolling = True # A static background allows the dirty rectangle renderer to be used
+        self.strips = [] # [speed, strip surface, image height, offset] per distinct speed
+        speeds = []
+        for _, speed in layers:
+            if speed not in speeds:
+                speeds.append(speed)
+        for speed in speeds:
+            images = [self._load(path) for path, layer_speed in layers if layer_speed == speed]
+            self.strips.append([speed] + self._build_strip(images, opaque=not self.strips))
+
+    def _load(self, path):
+        image = self.load_image(path).convert_alpha()
+        height = max(1, round(image.get_height() * self.screen_width / image.get_width()))
+        return pygame.transform.smoothscale(image, (self.screen_width, height))
+
+    def _build_strip(self, images, opaque):
+        # Stack the composited layer often enough that any window of screen height
+        # starting inside the first copy is one contiguous area of the strip.
+        height = max(image.get_height() for image in images)
+        copies = math.ceil(self.screen_height / height) + 1
+        strip = pygame.Surface((self.screen_width, height * copies), 0 if opaque else pygame.SRCALPHA)
+        for copy in range(copies):
+            for image in images:
+                strip.blit(image, (0, copy * height))
+        strip = strip.convert() if opaque else strip.convert_alpha()
+        return [strip, height, 0]
 
     def update(self):
         """
         Update the background position.
 
-        This method updates the position of the background image based on the move speed.
-        It also handles wrapping the background image when it goes off the screen.
+        This method moves every layer down by its speed and wraps it around
+        after one image height. Nothing happens if scrolling is turned off.
 
         """
-        self.bg_Y += self.move_speed
-        self.bg_Y2 += self.move_speed
-        if self.bg_Y > self.rect_bg.height: # If the first image goes off the screen, reset its position
-            self.bg_Y = -self.rect_bg.height
-        if self.bg_Y2 > self.rect_bg.height: # If the second image goes off the screen, reset its position
-            self.bg_Y2 = -self.rect_bg.height
-
-    def render(self, surface):
+        if not self.scrolling:
+            return
+        for layer in self.strips:
+            layer[3] = (layer[3] + layer[0]) % layer[2]
+
+    def render(self, surface, alpha=1.0, offsets=None):
         """
         Renders the background on the given surface.
 
         Args:
             surface (pygame.Surface): The surface to render the background on.
+            alpha (float): How far to interpolate between the previous (0) and the current (1) update.
+            offsets (tuple): Optional offset of every strip to render instead of the current ones, e.g. from a snapshot.
         """
-        surface.blit(self.image, (self.bg_x, self.bg_Y))
-        surface.blit(self.image, (self.bg_x2, self.bg_Y2))
+        for index, (speed, strip, height, offset) in enumerate(self.strips):
+            if offsets is not None:
+                offset = offsets[index]
+            if self.scrolling and alpha < 1.0:
+                offset = (offset - speed * (1.0 - alpha)) % height
+            area = pygame.Rect(0, height - int(offset), self.screen_width, self.screen_height) # Window into the strip
+            surface.blit(strip, (0, 0), area)
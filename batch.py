@@ -0,0 +1,185 @@
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from controls import ScriptedInput, RandomInput, DodgeBot
+from difficulty_menu import DIFFICULTY_SETTINGS
+
+PARAMETERS = ('enemy_speed', 'enemy_spawn_rate', 'player_speed', 'bullet_speed', 'max_enemies')
+
+POLICIES = { # Name -> factory(game, seed) returning the input source of one run
+    'idle': lambda game, seed: ScriptedInput(()),
+    'fire': lambda game, seed: ScriptedInput(lambda frame: (False, False, True)),
+    'random': lambda game, seed: RandomInput(seed),
+    'dodge': lambda game, seed: DodgeBot(game),
+}
+
+COLUMNS = PARAMETERS + ('policy', 'runs', 'death_rate',
+                        'survival_mean', 'survival_p10', 'survival_p50', 'survival_p90',
+                        'score_mean', 'score_std', 'score_min', 'score_p10', 'score_p50', 'score_p90', 'score_max',
+                        'tick_us_mean', 'tick_us_p90')
+
+_game = None # The headless game of a worker process, reused for all of its runs
+
+def parameter_grid(base='Easy', **values):
+    """
+    Returns every combination of the given difficulty parameter values.
+
+    Args:
+        base (str): The difficulty preset that provides the parameters without values.
+        **values: Lists of values for parameters in PARAMETERS, e.g. enemy_speed=[6, 8, 10].
+
+    Returns:
+        list: One dict of difficulty settings per combination.
+    """
+    settings = DIFFICULTY_SETTINGS[base]
+    axes = [values.get(name) or [settings[name]] for name in PARAMETERS]
+    return [dict(zip(PARAMETERS, combination)) for combination in itertools.product(*axes)]
+
+def run_chunk(settings, policy, seeds, max_frames):
+    """
+    Plays one headless round per seed with the given settings and policy.
+
+    Runs in a worker process. The process creates its game once and only resets it
+    between rounds, so a round costs no window, font or asset setup.
+
+    Args:
+        settings (dict): The difficulty settings.
+        policy (str): The name of the policy in POLICIES that controls the player.
+        seeds (list): One seed per round.
+        max_frames (int): The maximum number of frames per round.
+
+    Returns:
+        list: (frames, score, game_over, wall_time) per round.
+    """
+    global _game
+    if _game is None:
+        from game import AsteroidAvoidanceGame # Imported here so only the workers initialize pygame
+        _game = AsteroidAvoidanceGame(headless=True)
+    game = _game
+    results = []
+    for seed in seeds:
+        game.input_source = POLICIES[policy](game, seed)
+        game.reset(settings, seed)
+        start = time.perf_counter()
+        while not game.game_over and game.frame_count < max_frames:
+            game.step()
+        results.append((game.frame_count, game.score, game.game_over, time.perf_counter() - start))
+    return results
+
+def aggregate(settings, policy, results, tick_rate=30):
+    """
+    Summarizes the rounds of one parameter set and policy into a CSV row.
+
+    Args:
+        settings (dict): The difficulty settings.
+        policy (str): The name of the policy.
+        results (list): (frames, score, game_over, wall_time) per round.
+        tick_rate (int): The simulation ticks per second, used to convert frames into seconds.
+
+    Returns:
+        dict: The row, with the keys in COLUMNS.
+    """
+    frames, scores, game_over, wall_times = (np.array(column, dtype=np.float64) for column in zip(*results))
+    survival = frames / tick_rate
+    tick_us = wall_times / np.maximum(frames, 1) * 1e6
+    row = {name: settings[name] for name in PARAMETERS}
+    row.update({
+        'policy': policy,
+        'runs': len(results),
+        'death_rate': game_over.mean(),
+        'survival_mean': survival.mean(),
+        'survival_p10': np.percentile(survival, 10),
+        'survival_p50': np.percentile(survival, 50),
+        'survival_p90': np.percentile(survival, 90),
+        'score_mean': scores.mean(),
+        'score_std': scores.std(),
+        'score_min': scores.min(),
+        'score_p10': np.percentile(scores, 10),
+        'score_p50': np.percentile(scores, 50),
+        'score_p90': np.percentile(scores, 90),
+        'score_max': scores.max(),
+        'tick_us_mean': tick_us.mean(),
+        'tick_us_p90': np.percentile(tick_us, 90),
+    })
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in row.items()}
+
+def run_batch(grid, policies, output, runs=100, max_frames=1800, seed=0, workers=None, chunk_size=25):
+    """
+    Plays `runs` headless rounds for every parameter set and policy on all cores and streams the results to a CSV file.
+
+    The rounds are split into chunks that are spread over a process pool. As soon as the
+    last chunk of a parameter set and policy finishes, its aggregated row is written and
+    flushed, so partial results can be inspected while the batch is running. Every
+    parameter set is played with the same seeds, so the sets are compared on the same rounds.
+
+    Args:
+        grid (list): The difficulty settings to play, e.g. from parameter_grid.
+        policies (list): The names of the policies in POLICIES.
+        output (str): The path of the CSV file.
+        runs (int): The number of rounds per parameter set and policy.
+        max_frames (int): The maximum number of frames per round.
+        seed (int): The seed of the first round. The rounds use consecutive seeds.
+        workers (int): The number of worker processes. Defaults to the number of cores.
+        chunk_size (int): The number of rounds per task sent to a worker.
+
+    Returns:
+        int: The number of rows written.
+    """
+    seeds = list(range(seed, seed + runs))
+    chunks = [seeds[start:start + chunk_size] for start in range(0, runs, chunk_size)]
+    jobs = [(settings, policy) for settings in grid for policy in policies]
+    pending = {} # Job index -> [remaining chunks, collected results]
+    written = 0
+    with open(output, 'w', newline='') as file, ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(file, fieldnames=COLUMNS)
+        writer.writeheader()
+        file.flush()
+        futures = {}
+        for job, (settings, policy) in enumerate(jobs):
+            pending[job] = [len(chunks), []]
+            for chunk in chunks:
+                futures[executor.submit(run_chunk, settings, policy, chunk, max_frames)] = job
+        for future in as_completed(futures):
+            job = futures.pop(future)
+            state = pending[job]
+            state[0] -= 1
+            state[1].extend(future.result())
+            if state[0] == 0:
+                settings, policy = jobs[job]
+                writer.writerow(aggregate(settings, policy, pending.pop(job)[1]))
+                file.flush()
+                written += 1
+    return written
+
+def main():
+    """
+    Runs a batch of headless rounds over a grid of difficulty parameters from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Play many headless Asteroid Avoidance rounds over a grid of difficulty parameters.')
+    parser.add_argument('--difficulty', choices=sorted(DIFFICULTY_SETTINGS), default='Easy',
+                        help='the preset used for the parameters without values')
+    parser.add_argument('--enemy-speed', type=float, nargs='+')
+    parser.add_argument('--spawn-rate', type=float, nargs='+', help='chance per tick to spawn an enemy below the cap')
+    parser.add_argument('--player-speed', type=float, nargs='+')
+    parser.add_argument('--bullet-speed', type=float, nargs='+')
+    parser.add_argument('--max-enemies', type=int, nargs='+')
+    parser.add_argument('--policies', nargs='+', choices=sorted(POLICIES), default=['fire', 'dodge'])
+    parser.add_argument('--runs', type=int, default=100, help='rounds per parameter set and policy')
+    parser.add_argument('--frames', type=int, default=1800, help='maximum number of frames per round')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first round')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=25, help='rounds per task sent to a worker')
+    parser.add_argument('--output', default='batch_results.csv')
+    args = parser.parse_args()
+    grid = parameter_grid(args.difficulty, enemy_speed=args.enemy_speed, enemy_spawn_rate=args.spawn_rate,
+                          player_speed=args.player_speed, bullet_speed=args.bullet_speed, max_enemies=args.max_enemies)
+    start = time.perf_counter()
+    rows = run_batch(grid, args.policies, args.output, args.runs, args.frames, args.seed, args.workers, args.chunk_size)
+    print('%d rows (%d rounds) written to %s in %.1f s' % (rows, rows * args.runs, args.output, time.perf_counter() - start))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+import pygame
+from game import AsteroidAvoidanceGame
+from controls import ScriptedInput
+from bullet import Bullet, BulletPool
+from difficulty_menu import DIFFICULTY_SETTINGS
+from enemy import Enemy
+from enemy_swarm import EnemySwarm
+from particles import ParticleSystem, EXPLOSION
+from point import Point
+from polygon import Polygon
+
+PHASES = ('update_objects', 'check_collisions', 'draw_objects')
+
+class Scenario:
+    def __init__(self, difficulty, enemies, bullets, seed=0, particles=0):
+        """
+        Initializes a benchmark scenario.
+
+        The scenario keeps the number of live enemies, bullets and particles constant, so every
+        measured frame does the same amount of work.
+
+        Args:
+            difficulty (str): The difficulty level whose settings are used. Can be 'Easy' or 'Hard'.
+            enemies (int): The number of live enemies.
+            bullets (int): The number of live bullets.
+            seed (int): The seed for all random numbers.
+            particles (int): The number of live particles. 0 runs without a particle system, like a headless game.
+        """
+        self.difficulty = difficulty
+        self.enemies = enemies
+        self.bullets = bullets
+        self.particles = particles
+        self.seed = seed
+        self.name = '%s-%de-%db' % (difficulty.lower(), enemies, bullets)
+        if particles:
+            self.name += '-%dp' % particles
+
+    def setup(self):
+        """
+        Creates a headless game with the scenario's difficulty, enemies and bullets.
+
+        Returns:
+            AsteroidAvoidanceGame: The prepared game.
+        """
+        game = AsteroidAvoidanceGame(headless=True, seed=self.seed, input_source=ScriptedInput(()))
+        game.reset(dict(DIFFICULTY_SETTINGS[self.difficulty], max_enemies=max(self.enemies, 1)))
+        game.player.bullets = BulletPool(max(self.bullets, 1)) # Make room for all scenario bullets
+        self.rng = np.random.default_rng(self.seed)
+        if self.particles:
+            game.particles = game.player.particles = ParticleSystem(self.particles + EXPLOSION['count'], rng=self.rng)
+        self.refill(game)
+        return game
+
+    def refill(self, game):
+        """
+        Tops the game up to the scenario's number of enemies, bullets and particles and clears the game over flag.
+
+        Args:
+            game (AsteroidAvoidanceGame): The game to refill.
+        """
+        swarm = game.enemy_swarm
+        while swarm.count < self.enemies:
+            swarm.spawn(game.enemy_speed, x=self.rng.uniform(40, game.screen_width - 40), y=self.rng.uniform(0, game.screen_height))
+        pool = game.player.bullets
+        while pool.count < self.bullets:
+            pool.spawn(self.rng.uniform(0, game.screen_width), self.rng.uniform(0, game.screen_height), -game.player.bullet_speed)
+        particles = game.particles
+        while particles is not None and particles.count < self.particles: # In explosions, as when enemies are destroyed
+            particles.emit((self.rng.uniform(0, game.screen_width), self.rng.uniform(0, game.screen_height)), (255, 200, 120), **EXPLOSION)
+        game.game_over = False
+
+def run_frames(game, scenario, frames, timings=None, allocations=None):
+    """
+    Runs the given number of frames, measuring every phase separately.
+
+    Args:
+        game (AsteroidAvoidanceGame): The prepared game.
+        scenario (Scenario): The scenario used to refill the game between frames.
+        frames (int): The number of frames to run.
+        timings (dict): If given, the duration of every phase in milliseconds is appended here.
+        allocations (dict): If given, the bytes allocated by every phase (requires tracemalloc) are appended here.
+    """
+    for _ in range(frames):
+        scenario.refill(game)
+        for phase in PHASES:
+            method = getattr(game, phase)
+            if allocations is not None:
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                method()
+                allocations[phase].append(tracemalloc.get_traced_memory()[1] - before) # Peak bytes above the start of the phase
+            else:
+                start = time.perf_counter()
+                method()
+                timings[phase].append((time.perf_counter() - start) * 1000)
+
+def summarize(values):
+    """
+    Returns the mean, 95th and 99th percentile of the given values.
+
+    Args:
+        values (list): The measured values.
+
+    Returns:
+        dict: The statistics.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        'mean': float(values.mean()),
+        'p95': float(np.percentile(values, 95)),
+        'p99': float(np.percentile(values, 99)),
+    }
+
+def run_scenario(scenario, frames, warmup, measure_allocations):
+    """
+    Runs a scenario and returns its per-phase statistics.
+
+    Args:
+        scenario (Scenario): The scenario to run.
+        frames (int): The number of measured frames.
+        warmup (int): The number of frames run before measuring.
+        measure_allocations (bool): Whether to run a second pass measuring allocations.
+
+    Returns:
+        dict: The statistics of the scenario.
+    """
+    game = scenario.setup()
+    run_frames(game, scenario, warmup, timings={phase: [] for phase in PHASES})
+    timings = {phase: [] for phase in PHASES}
+    run_frames(game, scenario, frames, timings=timings)
+    frame_times = [sum(values) for values in zip(*timings.values())]
+    result = {
+        'difficulty': scenario.difficulty,
+        'enemies': scenario.enemies,
+        'bullets': scenario.bullets,
+        'particles': scenario.particles,
+        'frames': frames,
+        'phases': {phase: summarize(values) for phase, values in timings.items()},
+        'frame': summarize(frame_times),
+    }
+    if measure_allocations: # Separate pass, tracemalloc slows everything down
+        allocations = {phase: [] for phase in PHASES}
+        tracemalloc.start()
+        run_frames(game, scenario, frames, allocations=allocations)
+        tracemalloc.stop()
+        for phase, values in allocations.items():
+            result['phases'][phase]['alloc_bytes'] = float(np.mean(values))
+    return result
+
+def _build_entities(layout, count, shape, width, height, rand):
+    if layout == 'Point':
+        return [Point(rand() * width, rand() * height) for _ in range(count)]
+    if layout == 'Bullet':
+        return [Bullet(Point(rand() * width, rand() * height), -10) for _ in range(count)]
+    if layout == 'Polygon':
+        return [Polygon(shape, Point(rand() * width, rand() * height), 0) for _ in range(count)]
+    if layout == 'Enemy':
+        return [Enemy(Polygon(shape, Point(rand() * width, rand() * height), 0), 6, width, height) for _ in range(count)]
+    if layout == 'BulletPool':
+        pool = BulletPool(count)
+        for _ in range(count):
+            pool.spawn(rand() * width, rand() * height, -10)
+        return pool
+    swarm = EnemySwarm(shape, count, width, height, np.random.default_rng(0))
+    for _ in range(count):
+        swarm.spawn(6, rand() * width, rand() * height)
+    return swarm
+
+MEMORY_LAYOUTS = ('Point', 'Bullet', 'Polygon', 'Enemy', 'BulletPool', 'EnemySwarm')
+
+def measure_memory(count, seed=0):
+    """
+    Measures the memory needed per entity by the object-based and the array-based entity layouts.
+
+    Every layout is built with `count` entities at random positions while tracemalloc
+    traces the allocations. The objects tracked by the garbage collector are counted as
+    well, since they determine how expensive a collection is.
+
+    Args:
+        count (int): The number of entities.
+        seed (int): The seed for the positions.
+
+    Returns:
+        dict: Layout name -> {'bytes_per_entity', 'gc_objects_per_entity'}.
+    """
+    game = AsteroidAvoidanceGame(headless=True)
+    results = {}
+    for layout in MEMORY_LAYOUTS:
+        rand = random.Random(seed).random
+        gc.collect()
+        objects = len(gc.get_objects())
+        tracemalloc.start()
+        entities = _build_entities(layout, count, game.enemy_shape, game.screen_width, game.screen_height, rand)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results[layout] = {
+            'bytes_per_entity': size / count,
+            'gc_objects_per_entity': (len(gc.get_objects()) - objects) / count,
+        }
+        del entities
+    return results
+
+def print_memory(results):
+    """
+    Prints the results of measure_memory for several entity counts as a table.
+
+    Args:
+        results (dict): Entity count -> results of measure_memory.
+    """
+    print('%-12s %10s %16s %14s' % ('layout', 'entities', 'bytes/entity', 'gc objs/entity'))
+    for count, layouts in results.items():
+        for layout, stats in layouts.items():
+            print('%-12s %10d %16.1f %14.2f' % (layout, count, stats['bytes_per_entity'], stats['gc_objects_per_entity']))
+
+def git_commit():
+    """
+    Returns the current git commit, or None if it cannot be determined.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, baseline=None):
+    """
+    Prints the results as a table, optionally with the change against a baseline run.
+
+    Args:
+        results (dict): The benchmark results.
+        baseline (dict): The results of an earlier run to compare against.
+    """
+    previous = baseline['scenarios'] if baseline is not None else {}
+    print('%-28s %-17s %9s %9s %9s %12s' % ('scenario', 'phase', 'mean ms', 'p95 ms', 'p99 ms', 'alloc bytes'))
+    for name, scenario in results['scenarios'].items():
+        rows = list(scenario['phases'].items()) + [('frame', scenario['frame'])]
+        for phase, stats in rows:
+            line = '%-28s %-17s %9.3f %9.3f %9.3f %12s' % (name, phase, stats['mean'], stats['p95'], stats['p99'], '%.0f' % stats['alloc_bytes'] if 'alloc_bytes' in stats else '-')
+            old = previous.get(name)
+            if old is not None:
+                old_stats = old['frame'] if phase == 'frame' else old['phases'].get(phase)
+                if old_stats and old_stats['mean'] > 0:
+                    line += ' %+7.1f%%' % ((stats['mean'] / old_stats['mean'] - 1) * 100)
+            print(line)
+
+def main():
+    """
+    Runs the benchmark suite from the command line.
+    """
+    parser = argparse.ArgumentParser(description='Measure the cost of every phase of a game frame.')
+    parser.add_argument('--difficulty', nargs='+', choices=['Easy', 'Hard'], default=['Easy', 'Hard'])
+    parser.add_argument('--enemies', nargs='+', type=int, default=[5, 100, 500])
+    parser.add_argument('--bullets', nargs='+', type=int, default=[0, 100, 1000])
+    parser.add_argument('--particles', nargs='+', type=int, default=[0])
+    parser.add_argument('--frames', type=int, default=300, help='measured frames per scenario')
+    parser.add_argument('--warmup', type=int, default=30, help='frames run before measuring')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--allocations', action=argparse.BooleanOptionalAction, default=True, help='also measure allocations per phase')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--memory', nargs='*', type=int, metavar='ENTITIES',
+                        help='measure the memory per entity instead, for these entity counts (default 10000 100000)')
+    args = parser.parse_args()
+    if args.memory is not None:
+        memory = {count: measure_memory(count, args.seed) for count in args.memory or [10000, 100000]}
+        print_memory(memory)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump({'commit': git_commit(), 'memory': memory}, file, indent=2)
+        return
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'scenarios': {},
+    }
+    for difficulty in args.difficulty:
+        for enemies in args.enemies:
+            for bullets in args.bullets:
+                for particles in args.particles:
+                    scenario = Scenario(difficulty, enemies, bullets, args.seed, particles)
+                    results['scenarios'][scenario.name] = run_scenario(scenario, args.frames, args.warmup, args.allocations)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import pygame
+import numpy as np
 
 class Bullet:
+    __slots__ = ('position', 'velocity', 'radius', 'color')
+
     def __init__(self, position, velocity):
             """
             Initializes a new instance of the Bullet class.
@@ -44,3 +47,127 @@ class Bullet:
             surface (pygame.Surface): The surface to draw the bullet on.
         """
         pygame.draw.circle(surface, self.color, (self.position.x, self.position.y), self.radius) # Draw the bullet as a circle
+
+class BulletPool:
+    def __init__(self, capacity, radius=3, color=(255, 0, 0)):
+        """
+        Initializes a BulletPool with a fixed capacity.
+
+        All bullets are stored in preallocated arrays. Live bullets always occupy
+        the first `count` slots, so firing never allocates and removing bullets
+        is a single compaction pass.
+
+        Args:
+            capacity (int): The maximum number of live bullets.
+            radius (int): The radius of every bullet.
+            color (tuple): The color of every bullet.
+        """
+        self.capacity = capacity
+        self.radius = radius
+        self.color = color
+        self.positions = np.zeros((capacity, 2), dtype=np.float64)
+        self.previous_positions = np.zeros((capacity, 2), dtype=np.float64) # Positions before the last update, for interpolation
+        self.velocities = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, velocity):
+        """
+        Spawns a bullet in the next free slot.
+
+        Args:
+            x (float): The x-coordinate of the bullet.
+            y (float): The y-coordinate of the bullet.
+            velocity (float): The vertical velocity of the bullet.
+
+        Returns:
+            bool: True if the bullet was spawned, False if the pool is full.
+        """
+        if self.count >= self.capacity:
+            return False
+        self.positions[self.count] = (x, y)
+        self.previous_positions[self.count] = (x, y)
+        self.velocities[self.count] = velocity
+        self.count += 1
+        return True
+
+    def live_positions(self):
+        """
+        Returns the positions of all live bullets.
+
+        Returns:
+            numpy.ndarray: A view of shape (count, 2) into the pool's position array.
+        """
+        return self.positions[:self.count]
+
+    def live_previous_positions(self):
+        """
+        Returns the positions of all live bullets before the last update.
+
+        Returns:
+            numpy.ndarray: A view of shape (count, 2) into the pool's previous position array.
+        """
+        return self.previous_positions[:self.count]
+
+    def update(self):
+        """
+        Move all live bullets and remove the ones that have gone off the screen.
+
+        A bullet is removed one update after it left the screen, so the move that
+        took it off the screen is still checked for collisions.
+        """
+        count = self.count
+        self.previous_positions[:count] = self.positions[:count]
+        self.positions[:count, 1] += self.velocities[:count]
+        self._compact(self.previous_positions[:count, 1] >= 0)
+
+    def remove(self, indices):
+        """
+        Removes the bullets at the given indices.
+
+        Args:
+            indices (numpy.ndarray): The indices of the bullets to remove.
+        """
+        keep = np.ones(self.count, dtype=bool)
+        keep[indices] = False
+        self._compact(keep)
+
+    def clear(self):
+        """
+        Removes all bullets.
+        """
+        self.count = 0
+
+    def _compact(self, keep):
+        kept = int(np.count_nonzero(keep))
+        if kept < self.count: # Move the kept bullets to the front of the arrays
+            self.positions[:kept] = self.positions[:self.count][keep]
+            self.previous_positions[:kept] = self.previous_positions[:self.count][keep]
+            self.velocities[:kept] = self.velocities[:self.count][keep]
+            self.count = kept
+
+    def draw(self, surface, alpha=1.0, simple=False, state=None):
+        """
+        Draw all live bullets on the given surface.
+
+        Args:
+            surface (pygame.Surface): The surface to draw the bullets on.
+            alpha (float): How far to interpolate between the previous (0) and the current (1) positions.
+            simple (bool): Fill squares instead of drawing circles, which is cheaper.
+            state (tuple): Optional (previous positions, positions) of the bullets to draw, e.g. from a snapshot.
+
+        Returns:
+            list: The regions of the surface that were drawn on.
+        """
+        if state is None:
+            previous, positions = self.live_previous_positions(), self.live_positions()
+        else:
+            previous, positions = state
+        if alpha < 1.0:
+            positions = previous + (positions - previous) * alpha
+        if simple:
+            size = self.radius * 2
+            return [surface.fill(self.color, (round(x) - self.radius, round(y) - self.radius, size, size)) for x, y in positions.tolist()]
+        return [pygame.draw.circle(surface, self.color, position, self.radius) for position in positions.tolist()] # Draw the bullets as circles
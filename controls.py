@@ -0,0 +1,111 @@
+import random
+import numpy as np
+import pygame
+
+class KeyboardInput:
+    """
+    Reads the player's controls from the keyboard.
+    """
+    def read(self):
+        """
+        Returns the current state of the controls.
+
+        Returns:
+            tuple: (left, right, fire) as booleans.
+        """
+        pressed_keys = pygame.key.get_pressed() # Get the keys pressed by the user
+        return pressed_keys[pygame.K_LEFT], pressed_keys[pygame.K_RIGHT], pressed_keys[pygame.K_SPACE]
+
+class ScriptedInput:
+    def __init__(self, inputs):
+        """
+        Initializes a ScriptedInput that replays predefined controls, one entry per frame.
+
+        Args:
+            inputs: Either a sequence of (left, right, fire) tuples or a callable taking the
+                frame index and returning such a tuple. Once a sequence runs out, no keys are pressed.
+        """
+        self.inputs = inputs
+        self.frame = 0
+
+    def read(self):
+        """
+        Returns the controls for the current frame and advances to the next one.
+
+        Returns:
+            tuple: (left, right, fire) as booleans.
+        """
+        frame = self.frame
+        self.frame += 1
+        if callable(self.inputs):
+            return self.inputs(frame)
+        if frame < len(self.inputs):
+            return self.inputs[frame]
+        return False, False, False
+
+class RandomInput:
+    def __init__(self, seed=None, hold=15, fire_chance=0.5):
+        """
+        Initializes a RandomInput that presses random controls, e.g. as a baseline policy for simulations.
+
+        Args:
+            seed (int): Optional seed, which makes the controls reproducible.
+            hold (int): The number of frames each random choice is held.
+            fire_chance (float): The chance that fire is held during a choice.
+        """
+        self.random = random.Random(seed)
+        self.hold = hold
+        self.fire_chance = fire_chance
+        self.controls = (False, False, False)
+        self.frame = 0
+
+    def read(self):
+        """
+        Returns the controls for the current frame, choosing new ones every `hold` frames.
+
+        Returns:
+            tuple: (left, right, fire) as booleans.
+        """
+        if self.frame % self.hold == 0:
+            direction = self.random.randrange(3) # Left, right or neither
+            self.controls = (direction == 0, direction == 1, self.random.random() < self.fire_chance)
+        self.frame += 1
+        return self.controls
+
+class DodgeBot:
+    def __init__(self, game, lookahead=200, margin=40):
+        """
+        Initializes a DodgeBot that keeps firing and steps out of the way of enemies coming down at the player.
+
+        Args:
+            game (AsteroidAvoidanceGame): The game whose player and enemies are watched.
+            lookahead (int): How far above the player enemies are considered a threat, in pixels.
+            margin (int): How close horizontally an enemy has to be to be dodged, in pixels.
+        """
+        self.game = game
+        self.lookahead = lookahead
+        self.margin = margin
+
+    def read(self):
+        """
+        Returns the controls that move away from the closest threatening enemy.
+
+        Returns:
+            tuple: (left, right, fire) as booleans.
+        """
+        swarm = self.game.enemy_swarm
+        position = self.game.player.polygon.getPosition()
+        indices = swarm.indices()
+        if len(indices) == 0:
+            return False, False, True
+        offsets = swarm.positions[indices] - (position.x, position.y)
+        threats = (offsets[:, 1] > -self.lookahead) & (offsets[:, 1] < self.margin) & (np.abs(offsets[:, 0]) < self.margin)
+        if not threats.any():
+            return False, False, True
+        closest = offsets[threats][np.argmax(offsets[threats, 1])] # The lowest threat arrives first
+        left = closest[0] >= 0
+        if left and position.x < self.margin: # Cornered at an edge, go around the enemy instead
+            left = False
+        elif not left and position.x > self.game.screen_width - self.margin:
+            left = True
+        return left, not left, True
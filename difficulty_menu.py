@@ -1,8 +1,45 @@
 import pygame
 from pygame.locals import *
+from hud import TextCache
+
+SETTINGS_TICK_RATE = 30 # The speeds in DIFFICULTY_SETTINGS are in pixels per tick at this tick rate
+
+DIFFICULTY_SETTINGS = { # The single source of the difficulty presets, used by the game, the menu and the tools
+    'Easy': {
+        'enemy_speed': 6,
+        'enemy_spawn_rate': 1.0, # Chance per tick to spawn an enemy while there are fewer than max_enemies
+        'player_speed': 5,
+        'bullet_speed': 10,
+        'fire_cooldown': 0.1, # Seconds from one shot to the next, the same at every tick rate
+        'max_enemies': 5
+    },
+    'Hard': { # Increase the enemy speed, player speed and bullet speed for hard difficulty
+        'enemy_speed': 8,
+        'enemy_spawn_rate': 1.0,
+        'player_speed': 8,
+        'bullet_speed': 12,
+        'fire_cooldown': 0.1,
+        'max_enemies': 5
+    }
+}
+
+def get_settings(difficulty):
+    """
+    Returns the settings of a difficulty level.
+
+    Args:
+        difficulty: The difficulty level, 'Easy' or 'Hard', or a dict of difficulty settings.
+            A dict overrides the values of the Easy preset; missing keys keep their Easy value.
+
+    Returns:
+        dict: A copy of the difficulty settings.
+    """
+    if isinstance(difficulty, str):
+        return dict(DIFFICULTY_SETTINGS[difficulty])
+    return dict(DIFFICULTY_SETTINGS['Easy'], **difficulty)
 
 class DifficultyMenu:
-    def __init__(self, window, window_width, window_height):
+    def __init__(self, window, window_width, window_height, text_cache=None):
         """
         Initialize the DifficultyMenu object.
 
@@ -10,11 +47,13 @@ class DifficultyMenu:
             window (pygame.Surface): The window surface to render the menu on.
             window_width (int): The width of the window.
             window_height (int): The height of the window.
+            text_cache (TextCache): Optional shared cache for the rendered menu texts.
         """
         self.window = window
         self.window_width = window_width
         self.window_height = window_height
-        self.font = pygame.font.Font(None, 36) 
+        self.text_cache = text_cache if text_cache is not None else TextCache(pygame.font.Font(None, 36))
+        self.font = self.text_cache.font
         self.selected_difficulty = None 
         self.text_easy_rect = None
         self.text_hard_rect = None
@@ -25,6 +64,7 @@ class DifficultyMenu:
 
         This method fills the window with a black color and renders the text for the difficulty options (Easy and Hard).
         The text is centered on the window and displayed using the specified font and color.
+        The texts are only rendered the first time, later calls reuse them from the text cache.
         The updated window is then displayed on the screen.
 
         Args:
@@ -34,8 +74,8 @@ class DifficultyMenu:
             None
         """
         self.window.fill((0, 0, 0)) # Fill the window with black color
-        text_easy = self.font.render("Easy", True, (255, 255, 255))
-        text_hard = self.font.render("Hard", True, (255, 255, 255))
+        text_easy = self.text_cache.render("Easy", (255, 255, 255))
+        text_hard = self.text_cache.render("Hard", (255, 255, 255))
         self.text_easy_rect = text_easy.get_rect(center=(self.window_width // 2, self.window_height // 2 - 50)) # Center the text
         self.text_hard_rect = text_hard.get_rect(center=(self.window_width // 2, self.window_height // 2 + 50)) 
         self.window.blit(text_easy, self.text_easy_rect)
@@ -45,47 +85,52 @@ class DifficultyMenu:
     def select_difficulty(self):
         """
         Allows the user to select a difficulty level by clicking on the corresponding text rectangle.
-        The method continuously checks for mouse events and updates the selected_difficulty attribute accordingly.
+        The method sleeps until the next event instead of polling, so waiting costs no CPU.
         If the user closes the window, the method will exit the game.
 
         Returns:
             str: The selected difficulty level ('Easy' or 'Hard').
         """
+        self.selected_difficulty = None
         while self.selected_difficulty is None:
-            for event in pygame.event.get(): # Check for events
-                if event.type == QUIT:
-                    pygame.quit()
-                    exit()
-                elif event.type == MOUSEBUTTONDOWN: # Check for mouse click
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    if self.text_easy_rect.collidepoint(mouse_x, mouse_y): # Check if the mouse click is on the 'Easy' text
-                        self.selected_difficulty = 'Easy'
-                    elif self.text_hard_rect.collidepoint(mouse_x, mouse_y): # Check if the mouse click is on the 'Hard' text
-                        self.selected_difficulty = 'Hard'
+            event = pygame.event.wait() # Sleep until the next event
+            if event.type == QUIT:
+                pygame.quit()
+                exit()
+            self.handle_event(event)
         return self.selected_difficulty
+
+    def handle_event(self, event):
+        """
+        Handles a single event while the menu is shown.
+
+        A click on a difficulty text selects it; an exposed window is redrawn.
+
+        Args:
+            event (pygame.event.Event): The event to handle.
+
+        Returns:
+            str: The selected difficulty level, or None if nothing was selected.
+        """
+        if event.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+            self.display_menu()
+        elif event.type == MOUSEBUTTONDOWN and self.text_easy_rect is not None: # Check for mouse click
+            if self.text_easy_rect.collidepoint(event.pos): # Check if the mouse click is on the 'Easy' text
+                self.selected_difficulty = 'Easy'
+                return 'Easy'
+            if self.text_hard_rect.collidepoint(event.pos): # Check if the mouse click is on the 'Hard' text
+                self.selected_difficulty = 'Hard'
+                return 'Hard'
+        return None
     
     def difficulty_settings(self):
         """
-        Sets the difficulty settings for the game.
+        Returns the settings of the selected difficulty level.
 
         The difficulty settings include the speed of enemies, the rate at which enemies spawn,
-        the speed of the player, and the speed of bullets.
+        the speed of the player, the speed of bullets and the number of enemies alive at the same time.
 
         Returns:
-            dict: A dictionary containing the difficulty settings.
+            dict: A copy of the difficulty settings.
         """
-        EASY = { # Set the default values for easy difficulty   
-            'enemy_speed': 8,
-            'enemy_spawn_rate': 0.05,
-            'player_speed': 5,
-            'bullet_speed': 10
-        }
-
-        HARD = { # Increase the enemy speed, spawn rate, and player speed for hard difficulty
-            'enemy_speed': 12,
-            'enemy_spawn_rate': 0.4,
-            'player_speed': 8,
-            'bullet_speed': 12
-        }
-
-        return EASY if self.selected_difficulty == 'Easy' else HARD
+        return get_settings('Easy' if self.selected_difficulty == 'Easy' else 'Hard')
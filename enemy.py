@@ -3,6 +3,8 @@ from polygon import Polygon, Point
 import random
 
 class Enemy:
+    __slots__ = ('polygon', 'speed', 'color', 'rect', 'screen_width', 'screen_height')
+
     def __init__(self, polygon, speed, screen_width, screen_height):
         """
         Initializes an instance of the Enemy class.
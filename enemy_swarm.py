@@ -0,0 +1,360 @@
+import pygame
+import numpy as np
+from polygon import ShapeTemplate, segments_hit_polygon, pad_vertices
+
+BRUTE_FORCE_PAIRS = 4096 # Up to this many query-enemy pairs, the collision tests skip the sorted broad phase
+
+class EnemySwarm:
+    def __init__(self, shape, capacity, screen_width, screen_height, rng=None, color_levels=8):
+        """
+        Initializes an EnemySwarm holding all enemies in flat NumPy arrays.
+
+        Every enemy shares the same template shape, so only the position, speed,
+        color and alive flag are stored per enemy. Moving, respawning and speeding
+        up the whole swarm are single vectorized operations.
+
+        Args:
+            shape: The points or the ShapeTemplate describing the shape shared by all enemies.
+            capacity (int): The maximum number of enemies alive at the same time.
+            screen_width (int): The width of the screen.
+            screen_height (int): The height of the screen.
+            rng (numpy.random.Generator): Optional random generator used for spawn positions and colors.
+            color_levels (int): The number of levels per color channel. Fewer distinct colors keep the sprite cache small.
+        """
+        self.capacity = capacity
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.template = ShapeTemplate.of(shape) # Shape in local space, shared by all enemies
+        self.template_vertices = self.template.vertices
+        self.template_points = self.template.points
+        self.shape_key = ('enemy', self.template_points) # Identifies the shape in the sprite cache
+        self.template_bounds = self.template.bounds # min_x, min_y, max_x, max_y
+        self.positions = np.zeros((capacity, 2), dtype=np.float64)
+        self.previous_positions = np.zeros((capacity, 2), dtype=np.float64) # Positions before the last move, for interpolation
+        self.speeds = np.zeros(capacity, dtype=np.float64)
+        self.colors = np.zeros((capacity, 3), dtype=np.uint8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.color_levels = color_levels
+        self.count = 0
+
+    def spawn(self, speed, x=None, y=0):
+        """
+        Spawns a new enemy in the first free slot.
+
+        Args:
+            speed (float): The speed at which the enemy moves downwards.
+            x (float): The x-coordinate of the new enemy. A random x-coordinate is used if None.
+            y (float): The y-coordinate of the new enemy.
+
+        Returns:
+            int: The index of the new enemy, or -1 if the swarm is full.
+        """
+        if self.count >= self.capacity:
+            return -1
+        index = int(np.argmin(self.alive)) # First free slot
+        if x is None:
+            x = self.rng.integers(40, self.screen_width - 40, endpoint=True)
+        self.positions[index] = (x, y)
+        self.previous_positions[index] = (x, y)
+        self.speeds[index] = speed
+        self.colors[index] = self.rng.integers(0, self.color_levels, size=3) * 255 // (self.color_levels - 1)
+        self.alive[index] = True
+        self.count += 1
+        return index
+
+    def kill(self, index):
+        """
+        Removes the enemy at the given index, or the enemies at an array of distinct indices, from the swarm.
+
+        Args:
+            index: The index of the enemy to remove, or a numpy.ndarray of indices.
+        """
+        self.count -= int(np.count_nonzero(self.alive[index])) # Enemies that are already dead don't count
+        self.alive[index] = False
+
+    def clear(self):
+        """
+        Removes all enemies from the swarm.
+        """
+        self.alive[:] = False
+        self.count = 0
+
+    def move(self):
+        """
+        Move all alive enemies downwards by their speed.
+
+        Enemies that go beyond the screen height are repositioned at a random
+        x-coordinate at the top of the screen.
+        """
+        self.previous_positions[:] = self.positions
+        self.positions[:, 1] += np.where(self.alive, self.speeds, 0)
+        respawn = self.alive & (self.positions[:, 1] > self.screen_height)
+        respawn_count = int(np.count_nonzero(respawn))
+        if respawn_count:
+            self.positions[respawn, 0] = self.rng.integers(40, self.screen_width - 40, size=respawn_count, endpoint=True)
+            self.positions[respawn, 1] = 0
+            self.previous_positions[respawn] = self.positions[respawn] # Don't interpolate across the respawn
+
+    def speed_up(self, amount=1):
+        """
+        Increase the speed of all alive enemies.
+
+        Args:
+            amount (float): The amount added to the speed of every enemy.
+        """
+        self.speeds[self.alive] += amount
+
+    def indices(self):
+        """
+        Returns the indices of all alive enemies.
+
+        Returns:
+            numpy.ndarray: The indices of the alive enemies.
+        """
+        return np.flatnonzero(self.alive)
+
+    def vertices(self, indices=None):
+        """
+        Returns the world-space vertices of the given enemies.
+
+        Args:
+            indices (numpy.ndarray): The enemy indices. All alive enemies are used if None.
+
+        Returns:
+            numpy.ndarray: An array of shape (len(indices), vertex_count, 2).
+        """
+        if indices is None:
+            indices = self.indices()
+        return self.positions[indices, None, :] + self.template_vertices
+
+    def contains(self, index, point):
+        """
+        Check if the point is contained within the enemy at the given index.
+
+        Args:
+            index (int): The index of the enemy.
+            point (Point): The point to check.
+
+        Returns:
+            bool: True if the point is inside the enemy, False otherwise.
+        """
+        x, y = self.positions[index]
+        return bool(self.template.contains_many(np.array([(point.x - x, point.y - y)]))[0]) # Test in the template's local space
+
+    def _candidates(self, low, high):
+        # Returns the (query, enemy) pairs where the enemy's position lies inside
+        # the query's box [low, high], ordered by query. The enemies are bucketed
+        # into columns as wide as the template and one-pixel rows, and sorted by
+        # (column, row). A prefix count over the buckets gives the range of
+        # enemies in any vertical strip of a column with two lookups, so each
+        # query only looks at the columns its box overlaps and, within them, the
+        # enemies in its vertical range. Vertically the box is rounded out to
+        # whole rows, so a pair may lie up to a pixel above or below it; the
+        # exact tests that follow reject those. For a few queries and enemies, where the
+        # fixed cost of bucketing dominates, all pairs are tested directly instead.
+        indices = self.indices()
+        if len(low) == 0 or len(indices) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        positions = self.positions[indices]
+        if len(low) * len(indices) <= BRUTE_FORCE_PAIRS:
+            inside = ((positions[:, 0] >= low[:, 0, None]) & (positions[:, 0] <= high[:, 0, None]) &
+                      (positions[:, 1] >= low[:, 1, None]) & (positions[:, 1] <= high[:, 1, None]))
+            query_indices, slots = np.nonzero(inside) # Row-major, so ordered by query
+            return query_indices, indices[slots]
+        column_width = self.template_bounds[2] - self.template_bounds[0]
+        origin = positions.min(axis=0)
+        enemy_columns = ((positions[:, 0] - origin[0]) // column_width).astype(np.intp)
+        enemy_rows = (positions[:, 1] - origin[1]).astype(np.intp)
+        columns = int(enemy_columns.max()) + 1
+        rows = int(enemy_rows.max()) + 1
+        buckets = enemy_columns * rows + enemy_rows
+        order = np.argsort(buckets, kind='stable')
+        sorted_x = positions[order, 0] # Contiguous copy for the final filter
+        order = indices[order]
+        prefix = np.zeros(columns * rows + 1, dtype=np.intp)
+        np.cumsum(np.bincount(buckets, minlength=columns * rows), out=prefix[1:]) # Enemies before every bucket
+
+        first_column = np.floor((low[:, 0] - origin[0]) / column_width).astype(np.intp)
+        column_counts = np.floor((high[:, 0] - origin[0]) / column_width).astype(np.intp) - first_column + 1
+        query_indices = np.repeat(np.arange(len(low)), column_counts) # One range per query and overlapped column
+        query_columns = first_column[query_indices] + np.arange(len(query_indices)) - np.repeat(np.cumsum(column_counts) - column_counts, column_counts)
+        valid = (query_columns >= 0) & (query_columns < columns)
+        query_indices = query_indices[valid]
+        bases = query_columns[valid] * rows
+        top = np.clip(np.floor(low[query_indices, 1] - origin[1]), 0, rows).astype(np.intp)
+        bottom = np.clip(np.floor(high[query_indices, 1] - origin[1]) + 1, 0, rows).astype(np.intp)
+        first = prefix[bases + top]
+        counts = np.maximum(prefix[bases + bottom] - first, 0)
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        query_indices = np.repeat(query_indices, counts)
+        starts = np.repeat(first - (np.cumsum(counts) - counts), counts) # Expand each range into pairs
+        slots = starts + np.arange(total)
+        enemy_x = sorted_x[slots]
+        inside = (enemy_x >= np.take(low[:, 0], query_indices)) & (enemy_x <= np.take(high[:, 0], query_indices)) # Columns are wider than the boxes
+        return query_indices[inside], order[slots[inside]]
+
+    def collide_points(self, points):
+        """
+        Finds every (point, enemy) pair where the point lies inside the enemy.
+
+        All points are tested against all alive enemies at once. A sorted broad
+        phase pairs each point only with the enemies whose template bounding box
+        can contain it, and the remaining pairs go through the crossing-number
+        test in the template's local space.
+
+        Args:
+            points (numpy.ndarray): An array of shape (N, 2) with the points to test.
+
+        Returns:
+            tuple: Two integer arrays (point_indices, enemy_indices) of equal length, ordered by point index.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        min_x, min_y, max_x, max_y = self.template_bounds
+        point_indices, enemy_indices = self._candidates(points - (max_x, max_y), points - (min_x, min_y))
+        if len(point_indices) == 0:
+            return point_indices, enemy_indices
+        inside = self.template.contains_many(np.take(points, point_indices, axis=0) - np.take(self.positions, enemy_indices, axis=0))
+        return point_indices[inside], enemy_indices[inside]
+
+    def collide_segments(self, starts, ends):
+        """
+        Finds every (segment, enemy) pair where a point moving along the segment during
+        the last move touches the moving enemy.
+
+        Each segment is the path of a point from its position before (start) to its
+        position after (end) the last tick, while every enemy moved from its previous
+        to its current position. Relative to the enemy the point moves along a straight
+        line, which is tested against the template: it hits if either end lies inside or
+        the line crosses an edge. Fast objects can therefore not pass through each
+        other between two ticks.
+
+        Args:
+            starts (numpy.ndarray): An array of shape (N, 2) with the positions before the last tick.
+            ends (numpy.ndarray): An array of shape (N, 2) with the positions after the last tick.
+
+        Returns:
+            tuple: Two integer arrays (segment_indices, enemy_indices) of equal length, ordered by segment index.
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+        indices = self.indices()
+        if len(starts) == 0 or len(indices) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        moves = self.positions[indices] - self.previous_positions[indices]
+        min_x, min_y, max_x, max_y = self.template_bounds
+        # Relative to an enemy that moved by m the segment starts at start + m, so
+        # the boxes only grow by the enemy moves in the direction they point to.
+        segment_indices, enemy_indices = self._candidates(np.minimum(starts + moves.min(axis=0), ends) - (max_x, max_y),
+                                                          np.maximum(starts + moves.max(axis=0), ends) - (min_x, min_y))
+        if len(segment_indices) == 0:
+            return segment_indices, enemy_indices
+        hits = self.template.intersects_segments(np.take(starts, segment_indices, axis=0) - np.take(self.previous_positions, enemy_indices, axis=0),
+                                                 np.take(ends, segment_indices, axis=0) - np.take(self.positions, enemy_indices, axis=0))
+        return segment_indices[hits], enemy_indices[hits]
+
+    def collide_polygon(self, polygon, previous_position=None):
+        """
+        Finds the enemies the given polygon touched during the last move.
+
+        Most enemies are rejected by two cheap tests, evaluated together in one pass
+        over all alive enemies: their bounding circles (grown by the distances both
+        moved) and their axis-aligned bounding boxes (covering the whole move) must
+        overlap the polygon's. The remaining ones are tested exactly, with the
+        polygons' full outlines, so concave shapes and wing tips are handled.
+        Relative to an enemy the polygon only translates, so the first contact is
+        always a vertex of one polygon reaching an edge of the other: the paths of
+        the polygon's vertices and its final outline are tested against the enemy,
+        and the paths of the enemy's vertices against the polygon. All of these
+        segments go through one call, each with the outline it is tested against.
+
+        Args:
+            polygon (Polygon): The polygon to test, at its current position.
+            previous_position (Point): The polygon's position before the last move. None tests the current position only.
+
+        Returns:
+            numpy.ndarray: The indices of the enemies touched.
+        """
+        indices = self.indices()
+        if len(indices) == 0:
+            return indices
+        template = polygon.getTemplate()
+        position = polygon.getPosition()
+        previous = previous_position if previous_position is not None else position
+        move = np.array((position.x - previous.x, position.y - previous.y))
+        vertices = polygon.getVertices()
+        pivot = polygon.getPivot()
+        current = self.positions[indices]
+        before = self.previous_positions[indices]
+
+        enemy_moves = current - before
+        offsets = current + self.template.pivot - (pivot.x, pivot.y)
+        distances = np.hypot(offsets[:, 0], offsets[:, 1]) - np.hypot(enemy_moves[:, 0], enemy_moves[:, 1])
+        low = np.minimum(vertices.min(axis=0), vertices.min(axis=0) - move) - self.template_bounds[2:] # The box as enemy positions
+        high = np.maximum(vertices.max(axis=0), vertices.max(axis=0) - move) - self.template_bounds[:2]
+        lowest = np.minimum(current, before)
+        highest = np.maximum(current, before)
+        near = ((distances <= template.radius + self.template.radius + np.hypot(*move)) & # Both early-outs in one pass over all enemies
+                (highest[:, 0] >= low[0]) & (highest[:, 1] >= low[1]) & (lowest[:, 0] <= high[0]) & (lowest[:, 1] <= high[1]))
+        indices = indices[near]
+        if len(indices) == 0:
+            return indices
+
+        current = current[near, None, :]
+        before = before[near, None, :]
+        local = vertices - (position.x, position.y) # The polygon relative to its position
+        # Per enemy, the paths of the polygon's vertices and its final outline are tested against the enemy,
+        # and the paths of the enemy's vertices against the polygon, all with one call
+        starts = np.concatenate(((vertices - move) - before, vertices - current,
+                                 before + self.template_vertices - (previous.x, previous.y)), axis=1)
+        ends = np.concatenate((vertices - current, np.roll(vertices, -1, axis=0) - current,
+                               current + self.template_vertices - (position.x, position.y)), axis=1)
+        count = max(len(local), len(self.template_vertices))
+        outlines = np.concatenate((np.broadcast_to(pad_vertices(self.template_vertices, count), (2 * len(local), count, 2)),
+                                   np.broadcast_to(pad_vertices(local, count), (len(self.template_vertices), count, 2))))
+        hits = segments_hit_polygon(starts.reshape(-1, 2), ends.reshape(-1, 2),
+                                    np.broadcast_to(outlines, (len(indices),) + outlines.shape).reshape(-1, count, 2))
+        hits = hits.reshape(len(indices), -1).any(axis=1)
+        return indices[hits]
+
+    def draw(self, surface, sprite_cache=None, alpha=1.0, simple=False, state=None):
+        """
+        Draw all alive enemies on the given surface.
+
+        With a sprite cache every enemy is a pre-rasterized sprite and the whole swarm
+        is drawn with a single `Surface.blits` call. Without one, every enemy is drawn as a polygon.
+        Simple drawing fills every enemy's bounding box instead, the cheapest way to show it.
+        With a state, the enemies of a snapshot are drawn instead of the swarm's own.
+
+        Args:
+            surface (pygame.Surface): The surface to draw the enemies on.
+            sprite_cache (SpriteCache): Optional cache of rasterized enemy sprites.
+            alpha (float): How far to interpolate between the previous (0) and the current (1) positions.
+            simple (bool): Fill the bounding boxes instead of drawing the shapes.
+            state (tuple): Optional (previous positions, positions, colors) of the enemies to draw.
+
+        Returns:
+            list: The regions of the surface that were drawn on.
+        """
+        if state is None:
+            indices = self.indices()
+            previous, positions, colors = self.previous_positions[indices], self.positions[indices], self.colors[indices]
+        else:
+            previous, positions, colors = state
+        colors = colors.tolist()
+        if alpha < 1.0:
+            positions = previous + (positions - previous) * alpha
+        if simple:
+            min_x, min_y, max_x, max_y = self.template_bounds.tolist()
+            return [surface.fill(color, (round(x + min_x), round(y + min_y), round(max_x - min_x), round(max_y - min_y)))
+                    for color, (x, y) in zip(colors, positions.tolist())]
+        if sprite_cache is None:
+            vertices = positions[:, None, :] + self.template_vertices
+            return [pygame.draw.polygon(surface, color, points) for color, points in zip(colors, vertices.tolist())]
+        blits = []
+        for color, (x, y) in zip(colors, positions.tolist()):
+            sprite, offset_x, offset_y = sprite_cache.get(self.shape_key, self.template_points, tuple(color))
+            blits.append((sprite, (round(x) + offset_x, round(y) + offset_y)))
+        return surface.blits(blits)
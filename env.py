@@ -0,0 +1,307 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from game import AsteroidAvoidanceGame
+from difficulty_menu import get_settings
+
+ACTION_COUNT = 8 # Actions are the bits left = 1, right = 2 and fire = 4, as in the replay format
+PLAYER_FEATURES = 4 # x, fire ready, live bullets, elapsed time
+ENEMY_FEATURES = 4 # alive, x and y relative to the player, speed
+
+def observation_size(difficulty='Easy'):
+    """
+    Returns the length of the state observation for a difficulty level.
+
+    Args:
+        difficulty: The difficulty level, 'Easy' or 'Hard', or a dict of difficulty settings.
+
+    Returns:
+        int: The number of floats in a state observation.
+    """
+    return PLAYER_FEATURES + ENEMY_FEATURES * get_settings(difficulty)['max_enemies']
+
+def pixel_shape():
+    """
+    Returns the shape of a pixel observation.
+
+    Returns:
+        tuple: (height, width, 3).
+    """
+    width, height = AsteroidAvoidanceGame.SCREEN_SIZE
+    return height, width, 3
+
+class _ActionInput:
+    def __init__(self):
+        self.controls = (False, False, False)
+
+    def read(self):
+        return self.controls
+
+class AsteroidAvoidanceEnv:
+    def __init__(self, difficulty='Easy', max_frames=1800, pixels=False, seed=None):
+        """
+        Initializes an environment that plays the game headless, one simulation tick per step.
+
+        The state observation is a float32 vector: the player's x position (as a fraction of the
+        screen width), whether the player can fire, the live bullets (as a fraction of the
+        capacity) and the elapsed fraction of max_frames, followed by one (alive, x, y, speed)
+        entry per enemy slot. The enemy positions are relative to the player, as fractions of
+        the screen size, and the speed is in pixels per tick. Empty slots are all zero.
+
+        With pixels, the frame is also rendered to an off-screen surface and copied through a
+        `pygame.surfarray.pixels3d` view straight into an (height, width, 3) uint8 array.
+
+        Args:
+            difficulty: The difficulty level, 'Easy' or 'Hard', or a dict of difficulty settings.
+            max_frames (int): The number of steps after which an episode is truncated.
+            pixels (bool): Whether the observation includes the rendered frame.
+            seed (int): Optional seed, which makes the episodes reproducible.
+        """
+        self.difficulty = difficulty
+        self.max_frames = max_frames
+        self.pixels = pixels
+        self.controls = _ActionInput()
+        self.game = AsteroidAvoidanceGame(headless=True, seed=seed, input_source=self.controls)
+        self.game.reset(difficulty)
+        self.observation_size = observation_size(difficulty)
+        self.surface = pygame.Surface(self.game.SCREEN_SIZE).convert() if pixels else None
+
+    def reset(self, seed=None):
+        """
+        Starts a new episode.
+
+        Args:
+            seed (int): Optional seed for the episode. Without it the random numbers continue from the previous episode.
+
+        Returns:
+            tuple: (observation, info). The observation is the state vector, or (state, pixels) with pixels.
+        """
+        self.game.reset(self.difficulty, seed)
+        return self._observation(), {'score': 0, 'frames': 0}
+
+    def step(self, action):
+        """
+        Advances the game by one simulation tick with the given action.
+
+        The reward is the number of enemies destroyed during the tick.
+
+        Args:
+            action (int): The pressed controls as bits: left = 1, right = 2, fire = 4.
+
+        Returns:
+            tuple: (observation, reward, terminated, truncated, info). The episode terminates when
+                the player is hit and is truncated after max_frames steps.
+        """
+        reward = self._advance(action)
+        info = {'score': self.game.score, 'frames': self.game.frame_count}
+        return self._observation(), reward, self.game.game_over, self.game.frame_count >= self.max_frames, info
+
+    def _advance(self, action):
+        self.controls.controls = (bool(action & 1), bool(action & 2), bool(action & 4))
+        score = self.game.score
+        self.game.step()
+        return self.game.score - score
+
+    def _observation(self):
+        state = np.empty(self.observation_size, dtype=np.float32)
+        if not self.pixels:
+            self.observe(state)
+            return state
+        pixels = np.empty(pixel_shape(), dtype=np.uint8)
+        self.observe(state, pixels)
+        return state, pixels
+
+    def observe(self, state, pixels=None):
+        """
+        Writes the current observation into the given arrays without allocating new ones.
+
+        Args:
+            state (numpy.ndarray): The float32 array of length observation_size the state is written to.
+            pixels (numpy.ndarray): Optional (height, width, 3) uint8 array the rendered frame is written to.
+        """
+        game = self.game
+        player = game.player
+        swarm = game.enemy_swarm
+        position = player.polygon.getPosition()
+        state[0] = position.x / game.screen_width
+        state[1] = player.fire_timer == 0
+        state[2] = len(player.bullets) / player.bullets.capacity
+        state[3] = game.frame_count / self.max_frames
+        enemies = state[PLAYER_FEATURES:].reshape(-1, ENEMY_FEATURES)
+        enemies[:, 0] = swarm.alive
+        enemies[:, 1] = (swarm.positions[:, 0] - position.x) / game.screen_width
+        enemies[:, 2] = (swarm.positions[:, 1] - position.y) / game.screen_height
+        enemies[:, 3] = swarm.speeds
+        enemies[:, 1:] *= enemies[:, :1] # Clear the empty slots
+        if pixels is not None:
+            self.render(pixels)
+
+    def render(self, pixels):
+        """
+        Renders the current frame off-screen and copies it into the given array.
+
+        Args:
+            pixels (numpy.ndarray): The (height, width, 3) uint8 array the frame is written to.
+        """
+        game = self.game
+        game.background.render(self.surface)
+        game.player.draw(self.surface, game.sprite_cache)
+        game.enemy_swarm.draw(self.surface, game.sprite_cache)
+        game.hud.set('score', game.score)
+        game.hud.draw(self.surface)
+        view = pygame.surfarray.pixels3d(self.surface) # Locks the surface until the view is released
+        np.copyto(pixels, view.transpose(1, 0, 2))
+        del view
+
+class VectorEnv:
+    def __init__(self, count, difficulty='Easy', max_frames=1800, pixels=False, workers=0):
+        """
+        Initializes a VectorEnv that steps `count` independent environments with one call.
+
+        Finished environments are reset automatically, so the observation returned for them
+        is the first one of the next episode; the info holds the score of the finished one.
+        The observations of all environments are written into shared batch arrays. With
+        workers, the environments are split over that many processes, which write their
+        observations straight into shared memory, so only the actions and rewards are sent
+        between the processes.
+
+        Args:
+            count (int): The number of environments.
+            difficulty: The difficulty level, 'Easy' or 'Hard', or a dict of difficulty settings.
+            max_frames (int): The number of steps after which an episode is truncated.
+            pixels (bool): Whether the observations include the rendered frames.
+            workers (int): The number of worker processes. 0 steps all environments in this process.
+        """
+        self.count = count
+        self.pixels = pixels
+        self.workers = []
+        self._memory = []
+        state_shape = (count, observation_size(difficulty))
+        pixels_shape = (count,) + pixel_shape()
+        if workers == 0:
+            self.envs = [AsteroidAvoidanceEnv(difficulty, max_frames, pixels) for _ in range(count)]
+            self.states = np.zeros(state_shape, dtype=np.float32)
+            self.frames = np.zeros(pixels_shape, dtype=np.uint8) if pixels else None
+            return
+        self.envs = None
+        self.states = self._shared(state_shape, np.float32)
+        self.frames = self._shared(pixels_shape, np.uint8) if pixels else None
+        context = multiprocessing.get_context('spawn') # Every worker initializes its own pygame
+        for indices in np.array_split(np.arange(count), workers):
+            if len(indices) == 0:
+                continue
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(worker_connection, indices.tolist(), difficulty, max_frames, pixels,
+                                            self._memory[0].name, state_shape,
+                                            self._memory[1].name if pixels else None, pixels_shape))
+            process.start()
+            worker_connection.close()
+            self.workers.append((process, connection, indices))
+
+    def _shared(self, shape, dtype):
+        memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        self._memory.append(memory)
+        return np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+    def _observations(self):
+        return (self.states, self.frames) if self.pixels else self.states
+
+    def reset(self, seed=None):
+        """
+        Starts a new episode in every environment.
+
+        Args:
+            seed (int): Optional seed. Environment i is seeded with seed + i.
+
+        Returns:
+            tuple: (observations, info). The observations are the batch arrays, which are overwritten by the next call.
+        """
+        seeds = [None if seed is None else seed + index for index in range(self.count)]
+        if self.envs is not None:
+            for index, env in enumerate(self.envs):
+                env.game.reset(env.difficulty, seeds[index])
+                env.observe(self.states[index], None if self.frames is None else self.frames[index])
+        else:
+            for _, connection, indices in self.workers:
+                connection.send(('reset', [seeds[index] for index in indices]))
+            for _, connection, _ in self.workers:
+                connection.recv()
+        return self._observations(), {'score': np.zeros(self.count, dtype=np.int64)}
+
+    def step(self, actions):
+        """
+        Advances every environment by one simulation tick.
+
+        Args:
+            actions: One action per environment, as bits: left = 1, right = 2, fire = 4.
+
+        Returns:
+            tuple: (observations, rewards, terminated, truncated, info) with one entry per environment.
+                The info holds the score and the frames of the episodes at the end of the step.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if self.envs is not None:
+            results = _step_envs(self.envs, actions, self.states, self.frames)
+        else:
+            for _, connection, indices in self.workers:
+                connection.send(('step', actions[indices]))
+            results = np.empty((5, self.count), dtype=np.int64)
+            for _, connection, indices in self.workers:
+                results[:, indices] = connection.recv()
+        rewards, terminated, truncated, scores, frames = results
+        return (self._observations(), rewards.astype(np.float32), terminated.astype(bool), truncated.astype(bool),
+                {'score': scores, 'frames': frames})
+
+    def close(self):
+        """
+        Stops the worker processes and releases the shared memory.
+        """
+        for process, connection, _ in self.workers:
+            connection.send(('close', None))
+            process.join()
+            connection.close()
+        self.workers = []
+        self.states = self.frames = None
+        for memory in self._memory:
+            memory.close()
+            memory.unlink()
+        self._memory = []
+
+def _step_envs(envs, actions, states, frames):
+    results = np.empty((5, len(envs)), dtype=np.int64) # reward, terminated, truncated, score, frames
+    for index, env in enumerate(envs):
+        reward = env._advance(actions[index])
+        game = env.game
+        terminated = game.game_over
+        truncated = game.frame_count >= env.max_frames
+        results[:, index] = reward, terminated, truncated, game.score, game.frame_count
+        if terminated or truncated:
+            game.reset(env.difficulty)
+        env.observe(states[index], None if frames is None else frames[index])
+    return results
+
+def _worker(connection, indices, difficulty, max_frames, pixels, state_name, state_shape, pixels_name, pixels_shape):
+    envs = [AsteroidAvoidanceEnv(difficulty, max_frames, pixels) for _ in indices]
+    state_memory = shared_memory.SharedMemory(name=state_name)
+    states = np.ndarray(state_shape, dtype=np.float32, buffer=state_memory.buf)[indices[0]:indices[-1] + 1]
+    frames = None
+    if pixels_name is not None:
+        pixels_memory = shared_memory.SharedMemory(name=pixels_name)
+        frames = np.ndarray(pixels_shape, dtype=np.uint8, buffer=pixels_memory.buf)[indices[0]:indices[-1] + 1]
+    while True:
+        command, data = connection.recv()
+        if command == 'step':
+            connection.send(_step_envs(envs, data, states, frames))
+        elif command == 'reset':
+            for index, env in enumerate(envs):
+                env.game.reset(env.difficulty, data[index])
+                env.observe(states[index], None if frames is None else frames[index])
+            connection.send(None)
+        else:
+            break
+    del states, frames
+    state_memory.close()
+    if pixels_name is not None:
+        pixels_memory.close()
@@ -1,52 +1,126 @@
 import pygame
 from pygame.locals import *
-from polygon import Polygon, Point
-from enemy import Enemy
+from polygon import Point, ShapeTemplate
+from enemy_swarm import EnemySwarm
 from player import Player
 from background import Background
-from bullet import Bullet
-from difficulty_menu import DifficultyMenu
+from difficulty_menu import get_settings, SETTINGS_TICK_RATE
+from profiler import FrameProfiler
+from governor import FrameGovernor, QUALITY_LEVELS
+from renderer import DirtyRectRenderer
+from sprite_cache import SpriteCache
+from hud import Hud, TextCache
+from assets import AssetManager
+from controls import KeyboardInput
+from replay import ReplayWriter, RecordingInput
+from simulation import SimulationThread
+from particles import ParticleSystem, EXPLOSION
+import numpy as np
 import random
+import os
+import time
 
 class AsteroidAvoidanceGame:
-        def __init__(self):
+        SCREEN_SIZE = (500, 600) # Width and height of the window
+        def __init__(self, headless=False, seed=None, input_source=None, profile=False, dirty_rendering=False,
+                     tick_rate=30, render_fps=30, vsync=False, record_dir=None, adaptive_quality=False,
+                     threaded=False):
             """
             Initializes the Game class.
 
-            This method sets up the game window, initializes game variables, and loads game assets.
+            This method sets up the game window, initializes game variables, and starts loading the game
+            assets in the background.
 
             Parameters:
-                None
+                headless (bool): Run without a display or audio device. Nothing is rendered, no particles are
+                    emitted and the frame rate is not capped.
+                seed (int): Optional seed for all random numbers, which makes a run reproducible.
+                input_source: The object the player's controls are read from. Defaults to the keyboard.
+                profile (bool): Start with the frame profiler and its overlay enabled. F3 toggles it while playing.
+                dirty_rendering (bool): Only redraw and update the changed regions of the window each frame.
+                    This turns off the background scrolling.
+                tick_rate (int): Simulation ticks per second. Each step advances the game by exactly one tick,
+                    independent of how often frames are rendered. The speeds are scaled to the tick rate, so
+                    the game plays at the same pace with fewer, longer ticks.
+                render_fps (int): The maximum number of rendered frames per second. 0 renders uncapped.
+                vsync (bool): Synchronize rendering with the display refresh instead of capping it.
+                record_dir (str): Record every round played through `start` as a replay file in this directory.
+                adaptive_quality (bool): Lower the quality level while frames miss their time budget and restore
+                    it once there is headroom again. The bullet limit of the lower levels changes the gameplay,
+                    so rounds recorded with it may not replay exactly.
+                threaded (bool): Run the simulation ticks on a separate thread. The main thread only handles
+                    the events and draws the latest snapshot of the simulation, so a slow frame does not
+                    delay the next tick.
 
             Returns:
                 None
             """
+            self.headless = headless
+            if headless: # SDL dummy drivers, so no window or sound device is needed
+                os.environ['SDL_VIDEODRIVER'] = 'dummy'
+                os.environ['SDL_AUDIODRIVER'] = 'dummy'
             pygame.init() # Initialize the Pygame module
-            pygame.mixer.init() # Initialize the Pygame mixer module
-            self.FPS = 30 # Frames per second
+            if not headless:
+                pygame.mixer.init() # Initialize the Pygame mixer module
+            if seed is not None:
+                random.seed(seed)
+            self.rng = np.random.default_rng(seed) # Random generator used by the enemy swarm
+            self.input_source = input_source
+            self.record_dir = record_dir
+            self.recording = None # (replay writer, original input source) while a round is recorded
+            self.frame_count = 0 # Simulation ticks since the start of the round
+            self.TICK_RATE = tick_rate # Simulation ticks per second
+            self.speed_scale = SETTINGS_TICK_RATE / tick_rate # Converts the per-tick speeds of the settings to this tick rate
+            self.FPS = render_fps # Rendered frames per second, 0 for uncapped
+            self.vsync = vsync
             self.framesPerSec = pygame.time.Clock()
-            self.window = pygame.display.set_mode((500, 600))
+            self.profiler = FrameProfiler(enabled=profile, budget_ms=1000 / (render_fps or tick_rate)) # Times every phase of a frame
+            self.governor = FrameGovernor(self.profiler.budget_ms) if adaptive_quality else None
+            self.particles = None if headless else ParticleSystem(time_scale=self.speed_scale) # Explosions and the engine trail, only drawn
+            self.quality = QUALITY_LEVELS[0] # The quality settings currently applied
+            self.threaded = threaded
+            self.simulation = None # The simulation thread of the current round, if threaded
+            if vsync and not headless:
+                self.window = pygame.display.set_mode(self.SCREEN_SIZE, pygame.SCALED, vsync=1)
+            else:
+                self.window = pygame.display.set_mode(self.SCREEN_SIZE)
             pygame.display.set_caption('Asteroid Avoidance')
             self.screen_width, self.screen_height = pygame.display.get_surface().get_size() # Get the screen width and height
-            self.background = Background() # Create a background object
+            self.assets = AssetManager(audio=not headless) # Loads images and decodes music while the menu is shown
+            self.assets.add_image('pics/background.jpeg')
+            self.assets.add_music('menu', 'music/music-for-arcade.mp3')
+            self.assets.add_music('battle', 'music/epic-battle-153400.mp3')
+            self.assets.preload()
+            self.background = None # Created on the first round, once its image has been loaded
+            self.sprite_cache = SpriteCache() # Pre-rasterized player and enemy sprites
+            self.renderer = None
+            if dirty_rendering:
+                self.renderer = DirtyRectRenderer(self.window, self.render_background)
             self.player = None
-            self.enemygroup = []
+            self.enemy_swarm = None
+            self.settings = None # The difficulty settings of the current round
+            self.enemy_speed = 0
+            self.enemy_spawn_rate = 1.0 # Chance per tick to spawn an enemy while there are fewer than max_enemies
+            self.max_enemies = 5 # Maximum number of enemies alive at the same time
             self.score = 0
             self.best_score = 0
             self.white = (255, 255, 255)
             self.red = (255, 0, 0)
             self.black = (0, 0, 0)
-            self.font = pygame.font.Font(None, 36)
+            self.font = self.assets.font(None, 36)
+            self.text_cache = TextCache(self.font) # Menu and game over texts are rendered only once
+            self.hud = Hud(self.font, self.white) # Further fields (FPS, best score, time) can be added with add_field
+            self.hud.add_field('score', "Score: ", (10, 10), 0)
 
-            self.player_shape = [
+            self.player_shape = ShapeTemplate.of([
                 Point(0, -20),   # Top point
                 Point(10, 10),   # Right bottom point
                 Point(5, 0),     # Middle point
                 Point(-5, 0),    # Middle point
                 Point(-10, 10)   # Left bottom point
-            ]
+            ])
 
-            self.enemy_shape = [
+            self.enemy_shape = ShapeTemplate.of([ # Shared by all enemies
                 Point(0, -25),   # Top point
                 Point(15, -10),  # Right top point
                 Point(20, 0),    # Right middle point
@@ -55,71 +129,244 @@ class AsteroidAvoidanceGame:
                 Point(-15, 10),  # Left bottom point
                 Point(-20, 0),   # Left middle point
                 Point(-15, -10)  # Left top point
-            ]
+            ])
 
         def start(self):
             """
-            Starts the game loop and manages the game flow.
-
-            This method is responsible for initializing the game state, including the score, game over flag,
-            and difficulty level. It also handles the display of the difficulty menu, selection of the difficulty,
-            and starting and stopping the background music. Finally, it calls the `run_game_loop` method to start
-            the main game loop and displays the game over screen when the game is over.
-            """
-            while True:
-                pygame.mixer.music.load('music/music-for-arcade.mp3')
-                pygame.mixer.music.play(-1) # Play the background music. The -1 argument makes the music loop indefinitely.
-                self.start_time = pygame.time.get_ticks()
-                self.score = 0
-                self.game_over = False
-                self.difficulty_manager = DifficultyMenu(self.window, self.screen_width, self.screen_height) # Create a difficulty manager object
-                self.difficulty_manager.display_menu() # Display the difficulty menu
-                selected_difficulty = self.difficulty_manager.select_difficulty() # Select the difficulty level
-                self.set_difficulty(selected_difficulty)
-                pygame.mixer.music.stop()
-                pygame.mixer.music.load('music/epic-battle-153400.mp3')
-                pygame.mixer.music.play(-1)
-                self.run_game_loop() # Run the game loop
-                self.display_game_over() # Display the game over screen
+            Starts the game and manages the game flow until the window is closed.
+
+            The difficulty menu, the rounds and the game over screen are scenes on a scene stack driven
+            by one main loop. The menu and the game over screen sleep until the next event, so the game
+            uses almost no CPU while waiting, and nothing blocks input during a transition.
+            """
+            from scenes import SceneManager, MenuScene # Imported here because the scenes use this module
+            SceneManager(MenuScene(self)).run()
+
+        def start_round(self, difficulty):
+            """
+            Starts a new round with the given difficulty and the battle music.
+
+            If record_dir is set, the round's seed and per-tick input are recorded into a new replay file
+            until `end_round` is called.
+
+            Args:
+                difficulty (str): The difficulty level of the round.
+
+            Returns:
+                str: The path of the replay file, or None if the round is not recorded.
+            """
+            path = None
+            seed = None
+            if self.record_dir is not None:
+                os.makedirs(self.record_dir, exist_ok=True)
+                path = os.path.join(self.record_dir, time.strftime('replay-%Y%m%d-%H%M%S.rpl'))
+                seed = random.SystemRandom().randrange(2 ** 63)
+                self.recording = (ReplayWriter(path, seed, difficulty, self.TICK_RATE), self.input_source)
+                self.input_source = RecordingInput(self.input_source if self.input_source is not None else KeyboardInput(), self.recording[0])
+            self.reset(difficulty, seed)
+            self.assets.play_music('battle')
+            return path
+
+        def end_round(self):
+            """
+            Finishes the current round and closes its replay file, if it was recorded.
+            """
+            self.stop_simulation()
+            if self.recording is not None:
+                writer, self.input_source = self.recording
+                writer.close()
+                self.recording = None
+
+        def reset(self, difficulty, seed=None):
+            """
+            Reset the game state for a new round with the given difficulty.
+
+            Args:
+                difficulty: The difficulty level to set, 'Easy' or 'Hard', or a dict of difficulty settings.
+                seed (int): Optional seed for the round's random numbers, which makes it reproducible.
+
+            Returns:
+                None
+            """
+            self.stop_simulation()
+            if seed is not None:
+                random.seed(seed)
+                self.rng = np.random.default_rng(seed)
+            if self.background is None:
+                self.background = Background(self.screen_width, self.screen_height, load_image=self.assets.image, time_scale=self.speed_scale) # Create a background object
+                self.background.scrolling = self.renderer is None # The dirty rectangle renderer needs a static background
+            self.frame_count = 0
+            if self.particles is not None:
+                self.particles.clear()
+            self.start_time = self.get_time()
+            self.score = 0
+            self.game_over = False
+            self.set_difficulty(difficulty)
+            self.apply_quality(self.quality)
+            self.accumulator = 0.0 # Real time not simulated yet, in seconds
+            self.previous_time = time.perf_counter()
+            if self.renderer is not None:
+                self.renderer.invalidate() # The menu has been drawn over the window
+
+        def apply_quality(self, quality):
+            """
+            Applies a quality level, as chosen by the frame governor.
+
+            Args:
+                quality (dict): The quality settings, see governor.QUALITY_LEVELS.
+            """
+            self.quality = quality
+            if self.background is not None:
+                self.background.scrolling = quality['background_scrolling'] and self.renderer is None
+            if self.player is not None:
+                self.player.bullet_limit = quality['bullet_limit']
+
+        def quality_stats(self):
+            """
+            Returns the current quality level and the state of the frame governor.
+
+            Returns:
+                dict: The quality level and name, plus the governor's frame statistics if adaptive quality is on.
+            """
+            if self.governor is not None:
+                return self.governor.stats()
+            return {'quality_level': 0, 'quality': self.quality['name']}
+
+        def get_time(self):
+            """
+            Returns the game time in milliseconds.
+
+            The time is derived from the number of simulation ticks, so it does not depend on the
+            frame rate or on how fast the ticks are computed.
+
+            Returns:
+                int: The game time in milliseconds.
+            """
+            return self.frame_count * 1000 // self.TICK_RATE
 
         def set_difficulty(self, difficulty):
             """
             Set the game difficulty level.
 
+            The presets are defined in DIFFICULTY_SETTINGS. A dict of settings (as used by the batch
+            runner for tuning) overrides the values of the Easy preset; missing keys keep their Easy value.
+            The speeds and the spawn rate are converted from SETTINGS_TICK_RATE to the game's tick rate.
+
             Args:
-                difficulty (str): The difficulty level to set. Can be 'Easy' or 'Hard'.
+                difficulty: The difficulty level to set, 'Easy' or 'Hard', or a dict of difficulty settings.
 
             Returns:
                 None
             """
-            if difficulty == 'Easy':
-                player_speed = 5
-                self.enemy_speed = 6  # Set enemy_speed as an instance variable
-                bullet_speed = 10
-            elif difficulty == 'Hard':
-                player_speed = 8
-                self.enemy_speed = 8  # Set enemy_speed as an instance variable
-                bullet_speed = 12
-            self.player = Player(player_speed, bullet_speed, self.screen_width, self.screen_height) # Create a player object
-            self.enemygroup = [] # Initialize the enemy group
+            settings = self.settings = get_settings(difficulty)
+            scale = self.speed_scale
+            self.enemy_speed = settings['enemy_speed'] * scale  # Set enemy_speed as an instance variable
+            self.enemy_spawn_rate = 1 - (1 - settings['enemy_spawn_rate']) ** scale # Same chance per second of game time
+            self.max_enemies = settings['max_enemies']
+            fire_cooldown = max(round(settings['fire_cooldown'] * self.TICK_RATE) - 1, 0) # Ticks to wait after a shot
+            self.player = Player(settings['player_speed'] * scale, settings['bullet_speed'] * scale, self.screen_width, self.screen_height, fire_cooldown=fire_cooldown, input_source=self.input_source, particles=self.particles) # Create a player object
+            self.enemy_swarm = EnemySwarm(self.enemy_shape, self.max_enemies, self.screen_width, self.screen_height, self.rng) # Initialize the enemy swarm
             self.best_score = max(self.score, self.best_score)
 
-        def run_game_loop(self):
+        def run_game_loop(self, max_ticks=None):
             """
             Runs the game loop until the game is over.
+
+            The simulation advances in fixed ticks of 1 / TICK_RATE seconds. The real time elapsed since
+            the last frame is accumulated and as many ticks are run as fit into it; the remainder is used
+            to interpolate the rendered positions between the last two ticks. Rendering is capped at FPS
+            frames per second, runs uncapped if FPS is 0, or follows the display refresh with vsync.
+            With adaptive quality, the busy time of every frame is reported to the frame governor, and
+            the lowest quality levels limit the ticks run per frame, so a slow machine runs the game
+            slower instead of falling further behind. When threaded, the ticks run on the simulation
+            thread instead and every frame draws the latest snapshot it published.
+
+            Args:
+                max_ticks (int): Optional number of simulation ticks after which the loop stops.
+            """
+            self.previous_time = time.perf_counter()
+            try:
+                while not self.game_over and (max_ticks is None or self.frame_count < max_ticks): # Main game loop
+                    self.run_frame(max_ticks)
+            finally:
+                self.stop_simulation()
+
+        def run_frame(self, max_ticks=None, handle_events=True):
+            """
+            Runs one frame of the game loop: handles the events, runs the simulation ticks that are due,
+            draws the frame and waits for the frame cap.
+
+            When threaded, the simulation thread is started on the first frame of a round and the frame
+            draws the latest snapshot, interpolated by the time passed since its tick was due.
+
+            Args:
+                max_ticks (int): Optional number of simulation ticks after which no more ticks are run.
+                handle_events (bool): Whether to process the event queue. Turn off when the caller already does.
             """
-            while not self.game_over: # Main game loop
+            tick_length = 1.0 / self.TICK_RATE
+            self.profiler.begin_frame()
+            now = time.perf_counter()
+            self.accumulator += min(now - self.previous_time, 0.25) # Don't try to catch up after long stalls
+            self.previous_time = now
+            if handle_events:
                 self.handle_events()
-                self.update_objects()
-                self.check_collisions()
-                self.draw_objects()
-                current_time = pygame.time.get_ticks()
-                if current_time - self.start_time > 60000:
-                    for enemy in self.enemygroup: # Increase the speed of the enemies after 60 seconds
-                        enemy.speed += 1
-                self.start_time = current_time
+            self.profiler.mark('events')
+            if self.threaded:
+                if self.simulation is None:
+                    self.simulation = SimulationThread(self, max_ticks)
+                    self.simulation.start()
+                snapshot = self.simulation.buffer.latest()
+                alpha = min(max(now - snapshot.time, 0.0) / tick_length, 1.0) if self.quality['interpolation'] else 1.0
+                self.draw_objects(alpha, snapshot)
+            else:
+                max_steps = self.quality['max_steps_per_frame']
+                steps = 0
+                while self.accumulator >= tick_length and not self.game_over and (max_ticks is None or self.frame_count < max_ticks):
+                    self.step()
+                    self.accumulator -= tick_length
+                    steps += 1
+                    if max_steps is not None and steps >= max_steps:
+                        self.accumulator %= tick_length # Drop the ticks that don't fit into this frame
+                        break
+                self.draw_objects(min(self.accumulator / tick_length, 1.0) if self.quality['interpolation'] else 1.0)
+            if self.governor is not None and self.governor.record((time.perf_counter() - now) * 1000):
+                self.apply_quality(self.governor.settings)
+            if self.FPS and not self.vsync:
                 self.framesPerSec.tick(self.FPS)
-                self.best_score = max(self.score, self.best_score) # Update the best score if the current score is higher
+            else:
+                self.framesPerSec.tick()
+            self.profiler.mark('tick_wait')
+            self.profiler.end_frame()
+
+        def stop_simulation(self):
+            """
+            Stops the simulation thread of the current round, if there is one.
+            """
+            if self.simulation is not None:
+                self.simulation.stop()
+                self.simulation = None
+
+        def step(self):
+            """
+            Advances the game logic by one simulation tick without rendering.
+
+            This method updates the game objects, checks for collisions and applies the difficulty ramp:
+            every 60 seconds of game time, all enemies (including the ones spawned later) get faster.
+            It is used by the game loop as well as by the headless simulation.
+
+            Returns:
+                None
+            """
+            self.update_objects()
+            self.check_collisions()
+            self.profiler.mark('collisions')
+            self.frame_count += 1
+            current_time = self.get_time()
+            if current_time - self.start_time >= 60000:
+                self.enemy_swarm.speed_up(self.speed_scale) # Increase the speed of the enemies after 60 seconds
+                self.enemy_speed += self.speed_scale
+                self.start_time = current_time
+            self.best_score = max(self.score, self.best_score) # Update the best score if the current score is higher
 
         def handle_events(self):
             """
@@ -127,6 +374,7 @@ class AsteroidAvoidanceGame:
 
             This method iterates over the events in the Pygame event queue and handles them accordingly.
             If a QUIT event is detected, the Pygame module is quit and the program exits.
+            F3 toggles the profiler overlay and F4 writes the recorded frame timeline as a Chrome trace.
 
             Args:
                 None
@@ -136,14 +384,30 @@ class AsteroidAvoidanceGame:
             """
             for event in pygame.event.get(): 
                 if event.type == pygame.QUIT:
+                    self.stop_simulation()
                     pygame.quit()
                     exit()
+                self.handle_event(event)
+
+        def handle_event(self, event):
+            """
+            Handle a single event during a round.
+
+            F3 toggles the profiler overlay and F4 writes the recorded frame timeline as a Chrome trace.
+
+            Args:
+                event (pygame.event.Event): The event to handle.
+            """
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.toggle_overlay()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                self.profiler.export_chrome_trace('frame_trace.json')
 
         def update_objects(self):
             """
             Updates the game objects.
 
-            This method updates the background, player, bullets, and enemies in the game.
+            This method updates the background, player, bullets, enemies and particles in the game.
 
             Parameters:
             - None
@@ -151,19 +415,27 @@ class AsteroidAvoidanceGame:
             Returns:
             - None
             """
-            self.background.update()
+            if not self.headless: # The background only matters when rendering
+                self.background.update()
+            self.profiler.mark('background')
             self.player.update_position() # Update the player's position
-            self.player.update_bullets(self.window) # Update the player's bullets
+            self.profiler.mark('player')
+            self.player.update_bullets() # Update the player's bullets
+            self.profiler.mark('bullets')
             self.create_enemies() # Create new enemies
-            for enemy in self.enemygroup:
-                enemy.move()
+            self.profiler.mark('enemy_spawn')
+            self.enemy_swarm.move()
+            self.profiler.mark('enemy_move')
+            if self.particles is not None:
+                self.particles.update()
+                self.profiler.mark('particles')
 
         def create_enemies(self):
             """
-            Create new enemies and add them to the enemy group.
+            Create new enemies and add them to the enemy swarm.
 
-            This method checks the length of the enemy group and creates new enemies if the number of enemies is less than 5.
-            Each new enemy is created with a random position within the screen boundaries and added to the enemy group.
+            This method checks the number of enemies in the swarm and spawns a new enemy if it is less than max_enemies,
+            with a chance of enemy_spawn_rate per tick. Each new enemy is spawned with a random position within the screen boundaries.
 
             Parameters:
             - self: The Game object.
@@ -171,19 +443,22 @@ class AsteroidAvoidanceGame:
             Returns:
             - None
             """
-            if len(self.enemygroup) < 5: 
-                new_enemy_polygon = Polygon(self.enemy_shape, Point(random.randint(40, self.screen_width - 40), 0), 0)
-                new_enemy = Enemy(new_enemy_polygon, self.enemy_speed, self.screen_width, self.screen_height)
-                self.enemygroup.append(new_enemy)
+            if self.enemy_swarm.count < self.max_enemies:
+                if self.enemy_spawn_rate < 1.0 and self.rng.random() >= self.enemy_spawn_rate:
+                    return # Only draw a random number for partial rates, so seeded rounds and replays stay the same
+                self.enemy_swarm.spawn(self.enemy_speed)
 
         def check_collisions(self):
             """
             Check for collisions between bullets and enemies, as well as between enemies and the player.
 
-            This method iterates over the bullets fired by the player and the enemies in the game.
-            If a bullet intersects with an enemy, both the bullet and the enemy are removed from their respective groups.
-            Additionally, the player's score is incremented.
-            If an enemy intersects with the player, the game is marked as over.
+            All bullets are tested against all enemies in one batched call to the enemy swarm. The tests are swept:
+            the path each bullet and the player took during the tick is tested against the moving enemies, so
+            nothing passes through an enemy between two ticks, even at low tick rates.
+            If a bullet intersects with an enemy, the bullet is removed from the player's bullets and the enemy is removed from the swarm
+            in an explosion of particles.
+            Each enemy is destroyed by the first bullet hitting it and the player's score is incremented once per destroyed enemy.
+            If an enemy intersects with the player's outline, the game is marked as over.
 
             Parameters:
                 None
@@ -191,63 +466,111 @@ class AsteroidAvoidanceGame:
             Returns:
                 None
             """
-            for bullet in self.player.bullets[:]: # Iterate over a copy of the bullets list
-                for enemy in self.enemygroup[:]: # Iterate over a copy of the enemy group list
-                    if enemy.polygon.contains(bullet.position):
-                        self.enemygroup.remove(enemy) # Remove the enemy from the enemy group
-                        if bullet in self.player.bullets:
-                            self.player.bullets.remove(bullet) # Remove the bullet from the player's bullets
-                        self.score += 1
-            for enemy in self.enemygroup:
-                if enemy.polygon.contains(self.player.polygon.getPosition()): # Check if an enemy intersects with the player
-                    self.game_over = True
-                    break
-
-        def draw_objects(self):
+            bullets = self.player.bullets
+            if len(bullets):
+                bullet_hits, enemy_hits = self.enemy_swarm.collide_segments(bullets.live_previous_positions(), bullets.live_positions())
+                if len(enemy_hits):
+                    destroyed, first_hit = np.unique(enemy_hits, return_index=True) # Pairs are ordered by bullet, so this is the first bullet per enemy
+                    if self.particles is not None:
+                        swarm = self.enemy_swarm
+                        self.particles.emit(swarm.positions[destroyed], swarm.colors[destroyed] // 2 + 128, **EXPLOSION) # Brightened, so dark enemies show up
+                    self.enemy_swarm.kill(destroyed) # Remove the enemies from the enemy swarm
+                    self.score += len(destroyed)
+                    bullets.remove(bullet_hits[first_hit]) # Remove the bullets that hit an enemy
+
+            if len(self.enemy_swarm.collide_polygon(self.player.polygon, self.player.previous_position)): # Check if an enemy intersects with the player
+                self.game_over = True
+
+        def draw_objects(self, alpha=1.0, snapshot=None):
             """
             Draws all the game objects on the screen.
 
-            This method fills the window with a black color, renders the background,
-            draws the player, draws each enemy in the enemy group, displays the score,
+            This method renders the background (which covers the whole window),
+            draws the particles, draws the player, draws the enemy swarm, displays the score,
             and updates the display.
+            With dirty rendering only the regions drawn in the previous and the current frame
+            are restored and updated.
 
             Parameters:
-            - None
+            - alpha (float): How far to interpolate between the previous (0) and the current (1) simulation tick.
+            - snapshot (Snapshot): Optional state of a simulation tick to draw instead of the live game objects.
 
             Returns:
             - None
             """
-            self.window.fill(self.black)
-            self.background.render(self.window) # Render the background
-            self.player.draw(self.window)
-            for enemy in self.enemygroup:
-                enemy.draw(self.window)
-            self.display_score()
-            pygame.display.update()
+            background = player = enemies = particles = None
+            score = self.score
+            if snapshot is not None:
+                background, player, enemies, particles, score = snapshot.background, snapshot.player, snapshot.enemies, snapshot.particles, snapshot.score
+            if self.renderer is not None:
+                self.renderer.erase()
+            else:
+                self.background.render(self.window, alpha, background)
+            self.profiler.mark('draw_background')
+            rects = [] if self.particles is None else self.particles.draw(self.window, alpha, particles)
+            self.profiler.mark('draw_particles')
+            simple = self.quality['simple_shapes']
+            rects += self.player.draw(self.window, self.sprite_cache, alpha, simple, player)
+            self.profiler.mark('draw_player')
+            rects += self.enemy_swarm.draw(self.window, self.sprite_cache, alpha, simple, enemies)
+            self.profiler.mark('draw_enemies')
+            rects += self.display_score(score)
+            self.profiler.mark('draw_score')
+            info = (('quality', '%d %s' % (self.quality_stats()['quality_level'], self.quality['name'])),)
+            if self.simulation is not None:
+                info += (('simulation', '%.2f ms/tick' % self.simulation.stats()['tick_ms']),)
+            overlay_rect = self.profiler.draw_overlay(self.window, info)
+            if overlay_rect is not None:
+                rects.append(overlay_rect)
+            self.profiler.mark('draw_profiler')
+            if self.renderer is not None:
+                self.renderer.present(rects)
+            else:
+                pygame.display.update()
+            self.profiler.mark('display_flip')
+
+        def render_background(self, surface):
+            """
+            Renders the background on the given surface.
 
-        def display_score(self):
+            Args:
+                surface (pygame.Surface): The surface to render the background on.
+            """
+            self.background.render(surface) # Render the background, it covers the whole surface
+
+        def display_score(self, score=None):
             """
             Displays the current score on the game window.
+
+            The score text is only re-composed when the score changes.
+
+            Args:
+                score (int): The score to display. Defaults to the current score.
+
+            Returns:
+                list: The regions of the window the HUD was drawn on.
             """
-            score_text = self.font.render("Score: " + str(self.score), True, self.white)
-            self.window.blit(score_text, (10, 10))
+            self.hud.set('score', self.score if score is None else score)
+            return self.hud.draw(self.window)
 
         def display_game_over(self):
             """
             Displays the game over screen with the final score and best score.
+
+            The screen is drawn once and stays until something else is drawn; the game over scene
+            decides how long it is shown.
             """
-            game_over_text = self.font.render("GAME OVER", True, self.black)
+            game_over_text = self.text_cache.render("GAME OVER", self.black)
             text_rect = game_over_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2))
-            score_text = self.font.render("Score: " + str(self.score), True, self.white)
+            score_text = self.text_cache.render("Score: " + str(self.score), self.white)
             score_text_rect = score_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + 50))
-            best_score_text = self.font.render("Best Score: " + str(self.best_score), True, self.white)
+            best_score_text = self.text_cache.render("Best Score: " + str(self.best_score), self.white)
             best_score_text_rect = best_score_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + 100))
             self.window.fill(self.red)
             self.window.blit(game_over_text, text_rect)
             self.window.blit(score_text, score_text_rect)
             self.window.blit(best_score_text, best_score_text_rect)
             pygame.display.update()
-            pygame.time.delay(2000) # Delay for 2 seconds before restarting the game
 
 # if __name__ == "__main__":
 #     game = AsteroidAvoidanceGame()
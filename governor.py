@@ -0,0 +1,88 @@
+from collections import deque
+
+QUALITY_LEVELS = ( # From full quality to the cheapest frames
+    {'name': 'full', 'background_scrolling': True, 'interpolation': True, 'simple_shapes': False,
+     'bullet_limit': None, 'max_steps_per_frame': None},
+    {'name': 'static background', 'background_scrolling': False, 'interpolation': False, 'simple_shapes': False,
+     'bullet_limit': None, 'max_steps_per_frame': None},
+    {'name': 'simple shapes', 'background_scrolling': False, 'interpolation': False, 'simple_shapes': True,
+     'bullet_limit': 64, 'max_steps_per_frame': 2},
+    {'name': 'minimal', 'background_scrolling': False, 'interpolation': False, 'simple_shapes': True,
+     'bullet_limit': 32, 'max_steps_per_frame': 1},
+)
+
+class FrameGovernor:
+    def __init__(self, budget_ms, levels=QUALITY_LEVELS, window=30, headroom=0.6, restore_delay=150):
+        """
+        Initializes a FrameGovernor that trades quality for frame time.
+
+        The governor is fed the busy time of every frame. Once `window` frames have been
+        measured, it steps down one quality level if their average exceeds the budget, or
+        steps back up if the average stayed below `headroom` times the budget and no
+        change happened for `restore_delay` frames. Every change starts a new window, so
+        the effect of a level is measured before the next decision.
+
+        Args:
+            budget_ms (float): The frame time budget in milliseconds.
+            levels (tuple): The quality settings per level, from full quality to the cheapest.
+            window (int): The number of frames averaged for a decision.
+            headroom (float): The fraction of the budget the average must stay below to restore quality.
+            restore_delay (int): The minimum number of frames after a change before quality is restored.
+        """
+        self.budget_ms = budget_ms
+        self.levels = levels
+        self.headroom = headroom
+        self.restore_delay = restore_delay
+        self.level = 0
+        self.changes = 0
+        self.samples = deque(maxlen=window)
+        self.frames_since_change = 0
+
+    @property
+    def settings(self):
+        """
+        The quality settings of the current level.
+        """
+        return self.levels[self.level]
+
+    def record(self, frame_ms):
+        """
+        Records the busy time of a frame and changes the quality level if needed.
+
+        Args:
+            frame_ms (float): The time the frame took, without waiting for the frame cap, in milliseconds.
+
+        Returns:
+            bool: True if the quality level changed.
+        """
+        self.samples.append(frame_ms)
+        self.frames_since_change += 1
+        if len(self.samples) < self.samples.maxlen:
+            return False
+        average = sum(self.samples) / len(self.samples)
+        if average > self.budget_ms and self.level < len(self.levels) - 1:
+            self.level += 1
+        elif (average < self.budget_ms * self.headroom and self.level > 0
+              and self.frames_since_change >= self.restore_delay):
+            self.level -= 1
+        else:
+            return False
+        self.changes += 1
+        self.samples.clear()
+        self.frames_since_change = 0
+        return True
+
+    def stats(self):
+        """
+        Returns the state of the governor.
+
+        Returns:
+            dict: The current level, its name, the average of the current window, the budget and the number of changes.
+        """
+        return {
+            'quality_level': self.level,
+            'quality': self.settings['name'],
+            'average_ms': sum(self.samples) / len(self.samples) if self.samples else 0.0,
+            'budget_ms': self.budget_ms,
+            'quality_changes': self.changes,
+        }
@@ -0,0 +1,54 @@
+import argparse
+import json
+import time
+from game import AsteroidAvoidanceGame
+from controls import ScriptedInput
+
+def simulate(difficulty='Easy', inputs=(), max_frames=1800, seed=0, tick_rate=30):
+    """
+    Runs one round of the game without a display, audio or frame cap.
+
+    Args:
+        difficulty: The difficulty level, 'Easy' or 'Hard', or a dict of difficulty settings.
+        inputs: The player's controls, either a sequence of (left, right, fire) tuples
+            (one per frame) or a callable taking the frame index and returning such a tuple.
+        max_frames (int): The maximum number of frames to simulate.
+        seed (int): The seed for all random numbers.
+        tick_rate (int): Simulation ticks per second. Lower rates cover the same game time with fewer frames.
+
+    Returns:
+        dict: The final score and statistics of the run.
+    """
+    game = AsteroidAvoidanceGame(headless=True, seed=seed, input_source=ScriptedInput(inputs), tick_rate=tick_rate)
+    game.reset(difficulty)
+    start = time.perf_counter()
+    while not game.game_over and game.frame_count < max_frames:
+        game.step()
+    wall_time = time.perf_counter() - start
+    return {
+        'difficulty': difficulty,
+        'seed': seed,
+        'score': game.score,
+        'game_over': game.game_over,
+        'frames': game.frame_count,
+        'game_time': game.frame_count / game.TICK_RATE, # Seconds of game time
+        'wall_time': wall_time,
+        'frames_per_second': game.frame_count / wall_time if wall_time > 0 else float('inf'),
+    }
+
+def main():
+    """
+    Runs a headless simulation from the command line and prints the result as JSON.
+    """
+    parser = argparse.ArgumentParser(description='Run the Asteroid Avoidance game headless.')
+    parser.add_argument('--difficulty', choices=['Easy', 'Hard'], default='Easy')
+    parser.add_argument('--frames', type=int, default=1800, help='maximum number of frames to simulate')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tick-rate', type=int, default=30, help='simulation ticks per second')
+    parser.add_argument('--fire', action='store_true', help='hold the fire button for the whole run')
+    args = parser.parse_args()
+    inputs = (lambda frame: (False, False, True)) if args.fire else ()
+    print(json.dumps(simulate(args.difficulty, inputs, args.frames, args.seed, args.tick_rate), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+import pygame
+
+class TextCache:
+    def __init__(self, font, max_entries=256):
+        """
+        Initializes a TextCache that renders every (text, color) pair only once.
+
+        Args:
+            font (pygame.font.Font): The font used to render the text.
+            max_entries (int): The maximum number of cached surfaces. The least recently used ones are evicted.
+        """
+        self.font = font
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, text, color):
+        """
+        Returns the rendered text, rendering it only if it is not cached yet.
+
+        Args:
+            text (str): The text to render.
+            color (tuple): The color of the text.
+
+        Returns:
+            pygame.Surface: The rendered text. It must not be modified.
+        """
+        key = (text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+class Hud:
+    def __init__(self, font, color):
+        """
+        Initializes the Hud.
+
+        Every field is a fixed label followed by a value. Labels and single characters
+        are rendered once into a glyph atlas; a value is composed from cached glyphs
+        only when it changes, so an unchanged HUD costs one blit per field per frame.
+
+        Args:
+            font (pygame.font.Font): The font of the HUD.
+            color (tuple): The color of the HUD text.
+        """
+        self.font = font
+        self.color = color
+        self.glyphs = {} # Character or label -> rendered surface
+        self.fields = OrderedDict() # Name -> [label, position, value, composed surface]
+
+    def _glyph(self, text):
+        glyph = self.glyphs.get(text)
+        if glyph is None:
+            glyph = self.font.render(text, True, self.color)
+            self.glyphs[text] = glyph
+        return glyph
+
+    def add_field(self, name, label, position, value=''):
+        """
+        Adds a field to the HUD.
+
+        Args:
+            name (str): The name used to update the field.
+            label (str): The fixed label drawn before the value, e.g. "Score: ".
+            position (tuple): The top left corner of the field on the surface.
+            value: The initial value.
+        """
+        self.fields[name] = [label, position, None, None]
+        self.set(name, value)
+
+    def remove_field(self, name):
+        """
+        Removes a field from the HUD.
+
+        Args:
+            name (str): The name of the field.
+        """
+        self.fields.pop(name, None)
+
+    def set(self, name, value):
+        """
+        Sets the value of a field. The field is only re-composed if the value changed.
+
+        Args:
+            name (str): The name of the field.
+            value: The new value. It is drawn using str().
+        """
+        field = self.fields[name]
+        if field[2] == value and field[3] is not None:
+            return
+        field[2] = value
+        parts = [self._glyph(field[0])] + [self._glyph(char) for char in str(value)]
+        width = sum(part.get_width() for part in parts)
+        height = max(part.get_height() for part in parts)
+        composed = pygame.Surface((width, height), pygame.SRCALPHA)
+        x = 0
+        for part in parts:
+            composed.blit(part, (x, 0), special_flags=pygame.BLEND_RGBA_MAX) # Copy the glyph including its alpha
+            x += part.get_width()
+        field[3] = composed.convert_alpha()
+
+    def draw(self, surface):
+        """
+        Draw all fields on the given surface.
+
+        Args:
+            surface (pygame.Surface): The surface to draw the HUD on.
+
+        Returns:
+            list: The regions of the surface that were drawn on.
+        """
+        return [surface.blit(composed, position) for _, position, _, composed in self.fields.values()]
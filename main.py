@@ -1,10 +1,16 @@
+import argparse
 from game import AsteroidAvoidanceGame
 
 def main():
     """
     The main function that starts the Asteroid Avoidance Game.
     """
-    game_instance = AsteroidAvoidanceGame()
+    parser = argparse.ArgumentParser(description='Asteroid Avoidance')
+    parser.add_argument('--record', metavar='DIR', help='record every round as a replay file in this directory')
+    parser.add_argument('--adaptive-quality', action='store_true', help='lower the quality while frames miss their time budget')
+    parser.add_argument('--threaded', action='store_true', help='run the simulation on its own thread, independent of slow frames')
+    args = parser.parse_args()
+    game_instance = AsteroidAvoidanceGame(record_dir=args.record, adaptive_quality=args.adaptive_quality, threaded=args.threaded)
     game_instance.start()
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+import numpy as np
+import pygame
+
+# Emitter settings at SETTINGS_TICK_RATE: particles per origin, speed and lifetime ranges in pixels
+# per tick and ticks, and the direction and spread of the emission in radians (0 points right, y points down).
+EXPLOSION = {'count': 300, 'speed': (0.5, 6.0), 'lifetime': (12, 36), 'direction': 0.0, 'spread': 2 * np.pi}
+ENGINE_TRAIL = {'count': 3, 'speed': (2.0, 5.0), 'lifetime': (5, 12), 'direction': np.pi / 2, 'spread': 0.6}
+DIRTY_TILE = 32 # Size in pixels of the tiles the drawn regions are reported in
+
+class ParticleSystem:
+    def __init__(self, capacity=32768, drag=0.94, size=2, time_scale=1.0, rng=None):
+        """
+        Initializes a ParticleSystem with a fixed capacity.
+
+        All particles are stored in preallocated arrays (position, velocity, lifetime and
+        color). Live particles always occupy the first `count` slots, so emitting never
+        allocates per particle, and updating moves, slows down and ages all of them with
+        a few vectorized operations followed by one compaction pass. Drawing writes all
+        particles straight into the pixels of the surface in one batched pass.
+
+        Args:
+            capacity (int): The maximum number of live particles. Emitting into a full system drops the excess.
+            drag (float): The fraction of its velocity a particle keeps per tick at SETTINGS_TICK_RATE.
+            size (int): The width and height of a particle in pixels.
+            time_scale (float): The game's speed scale, which converts the speeds, lifetimes and drag to its tick rate.
+            rng (numpy.random.Generator): Optional random generator. Particles are only visual, so it should not
+                be the game's generator, which would change seeded rounds.
+        """
+        self.capacity = capacity
+        self.drag = drag ** time_scale
+        self.size = size
+        self.time_scale = time_scale
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float32)
+        self.lifetimes = np.zeros(capacity, dtype=np.float32) # Ticks left
+        self.durations = np.zeros(capacity, dtype=np.float32) # Ticks the particle lived for in total, for fading
+        self.colors = np.zeros((capacity, 3), dtype=np.uint8)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def emit(self, origins, colors, count, speed, lifetime, direction=0.0, spread=2 * np.pi):
+        """
+        Emits `count` particles from every origin with random speeds, lifetimes and directions.
+
+        Args:
+            origins: The (x, y) positions to emit from, shape (n, 2).
+            colors: One color for all particles, or one color per origin, shape (n, 3).
+            count (int): The number of particles per origin.
+            speed (tuple): The minimum and maximum speed in pixels per tick at SETTINGS_TICK_RATE.
+            lifetime (tuple): The minimum and maximum lifetime in ticks at SETTINGS_TICK_RATE.
+            direction (float): The direction in the middle of the emission, in radians.
+            spread (float): The width of the emission cone in radians. 2 * pi emits in all directions.
+
+        Returns:
+            int: The number of particles emitted.
+        """
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 2)
+        total = min(len(origins) * count, self.capacity - self.count)
+        if total <= 0:
+            return 0
+        start, end = self.count, self.count + total
+        rng = self.rng
+        angles = rng.uniform(direction - spread / 2, direction + spread / 2, total)
+        speeds = rng.uniform(speed[0], speed[1], total) * self.time_scale
+        lifetimes = rng.uniform(lifetime[0], lifetime[1], total) / self.time_scale
+        self.positions[start:end] = np.repeat(origins, count, axis=0)[:total]
+        self.velocities[start:end, 0] = np.cos(angles) * speeds
+        self.velocities[start:end, 1] = np.sin(angles) * speeds
+        self.lifetimes[start:end] = lifetimes
+        self.durations[start:end] = lifetimes
+        colors = np.broadcast_to(np.asarray(colors, dtype=np.uint8).reshape(-1, 3), (len(origins), 3))
+        self.colors[start:end] = np.repeat(colors, count, axis=0)[:total]
+        self.count = end
+        return total
+
+    def update(self):
+        """
+        Moves all live particles by their velocity, slows them down and removes the expired ones.
+        """
+        count = self.count
+        if count == 0:
+            return
+        self.positions[:count] += self.velocities[:count]
+        self.velocities[:count] *= self.drag
+        self.lifetimes[:count] -= 1
+        alive = self.lifetimes[:count] > 0
+        if alive.all():
+            return
+        keep = np.flatnonzero(alive)
+        live = len(keep)
+        for array in (self.positions, self.velocities, self.lifetimes, self.durations, self.colors):
+            array[:live] = array[keep]
+        self.count = live
+
+    def clear(self):
+        """
+        Removes all particles.
+        """
+        self.count = 0
+
+    def state(self):
+        """
+        Returns the live particles as needed for drawing.
+
+        Returns:
+            tuple: Views of the (positions, velocities, colors) and the remaining fraction of every particle's lifetime.
+        """
+        count = self.count
+        return (self.positions[:count], self.velocities[:count], self.colors[:count],
+                self.lifetimes[:count] / self.durations[:count])
+
+    def draw(self, surface, alpha=1.0, state=None):
+        """
+        Draw all live particles on the given surface in one batched pass.
+
+        The particles are written straight into the surface's pixel buffer, viewed as one flat
+        array of 32-bit pixels: the pixel under every particle is read with one vectorized
+        gather, blended from the particle's color towards it as the lifetime runs out, packed
+        in the surface's pixel format and written back with one scatter per pixel of the
+        particle size. Particles outside the surface are skipped.
+
+        The drawn regions are reported per group of particles rather than as one box around
+        all of them, so an explosion and the engine trail far below it don't make the dirty
+        rectangles cover the screen in between: the surface is divided into tiles of
+        DIRTY_TILE pixels, and every horizontal run of tiles holding particles is one region.
+
+        Args:
+            surface (pygame.Surface): The surface to draw the particles on. It must have 32 bits per pixel.
+            alpha (float): How far to interpolate between the previous (0) and the current (1) positions.
+            state (tuple): Optional particles to draw, as returned by `state`, e.g. from a snapshot.
+
+        Returns:
+            list: The regions of the surface that were drawn on.
+        """
+        positions, velocities, colors, fades = self.state() if state is None else state
+        if len(positions) == 0:
+            return []
+        if alpha < 1.0:
+            positions = positions - velocities * ((1.0 - alpha) / self.drag) # update() applies the drag after the move
+        width, height = surface.get_size()
+        size = self.size
+        xs = positions[:, 0].astype(np.intp)
+        ys = positions[:, 1].astype(np.intp)
+        inside = (xs >= 0) & (ys >= 0) & (xs <= width - size) & (ys <= height - size)
+        if not inside.all():
+            xs, ys, colors, fades = xs[inside], ys[inside], colors[inside], fades[inside]
+            if len(xs) == 0:
+                return []
+        row = surface.get_pitch() // 4
+        indices = ys * row + xs
+        view = surface.get_view('1') # Locks the surface until the view is released
+        pixels = np.frombuffer(view, dtype=np.uint32)
+        background = pixels[indices]
+        packed = np.full(len(indices), surface.get_masks()[3], dtype=np.uint32) # Opaque where there is an alpha channel
+        for channel, shift in enumerate(surface.get_shifts()[:3]):
+            under = (background >> shift) & 0xFF
+            value = under + (colors[:, channel] - under.astype(np.float32)) * fades
+            packed |= value.astype(np.uint32) << shift
+        for dy in range(size):
+            for dx in range(size):
+                pixels[indices + (dy * row + dx)] = packed
+        del pixels, view
+        columns = -(-width // DIRTY_TILE)
+        rows = -(-height // DIRTY_TILE)
+        occupied = np.zeros((rows, columns + 2), dtype=np.int8) # One empty column on each side ends every run
+        occupied[:, 1:-1] = np.bincount((ys // DIRTY_TILE) * columns + xs // DIRTY_TILE, minlength=rows * columns).reshape(rows, columns) > 0
+        changes = np.diff(occupied, axis=1)
+        run_rows, run_starts = np.nonzero(changes == 1)
+        run_ends = np.nonzero(changes == -1)[1] # Row-major like the starts, so they pair up
+        bounds = surface.get_rect()
+        # Every run is grown by the particle size, since particles can reach into the next tile
+        return [pygame.Rect(start * DIRTY_TILE, row * DIRTY_TILE, (end - start) * DIRTY_TILE + size, DIRTY_TILE + size).clip(bounds)
+                for row, start, end in zip(run_rows.tolist(), run_starts.tolist(), run_ends.tolist())]
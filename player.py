@@ -1,11 +1,13 @@
 # player.py
 
 import pygame
-from polygon import Polygon, Point
-from bullet import Bullet
+from polygon import Polygon, Point, ShapeTemplate
+from bullet import BulletPool
+from controls import KeyboardInput
+from particles import ENGINE_TRAIL
 
 class Player:
-    def __init__(self, speed, bullet_speed, screen_width, screen_height):
+    def __init__(self, speed, bullet_speed, screen_width, screen_height, fire_cooldown=2, bullet_capacity=256, input_source=None, particles=None):
         """
         Initializes the Player object.
 
@@ -14,32 +16,47 @@ class Player:
         - bullet_speed (int): The speed of the bullets fired by the player's spaceship.
         - screen_width (int): The width of the game screen.
         - screen_height (int): The height of the game screen.
+        - fire_cooldown (int): The number of ticks to wait after a shot before the next one. 0 fires every tick, 1 every other tick.
+        - bullet_capacity (int): The maximum number of bullets alive at the same time.
+        - input_source: The object the controls are read from. Defaults to the keyboard.
+        - particles (ParticleSystem): Optional particle system the engine trail is emitted into.
         """
         self.screen_width = screen_width
         self.screen_height = screen_height
-        self.polygon_shape = [ # Polygon shape of the player's spaceship
+        self.polygon_shape = ShapeTemplate.of([ # Polygon shape of the player's spaceship, shared by all players
             Point(0, -20),   # Top point
             Point(10, 10),   # Right bottom point
             Point(5, 0),     # Middle point
             Point(-5, 0),    # Middle point
             Point(-10, 10)   # Left bottom point
-        ]
+        ])
         self.color = (255, 255, 255)  # White color for the player's spaceship
         self.speed = speed
         self.bullet_speed = bullet_speed
         self.polygon = Polygon(self.polygon_shape, Point(self.screen_width // 2, self.screen_height - 70), 0)  # Initial position centered at the bottom
-        self.bullets = []
+        self.shape_key = ('player', self.polygon_shape.offsets) # Identifies the shape in the sprite cache
+        self.previous_position = Point(self.polygon.getPosition().x, self.polygon.getPosition().y) # Position before the last update, for interpolation
+        self.fire_cooldown = fire_cooldown
+        self.fire_timer = 0 # Ticks left until the player can shoot again
+        self.bullets = BulletPool(bullet_capacity)
+        self.bullet_limit = None # Optional lower limit of live bullets, set by the quality governor
+        self.input_source = input_source if input_source is not None else KeyboardInput()
+        self.particles = particles
+        self.trail_color = (255, 160, 40)
+        min_x, _, max_x, max_y = self.polygon_shape.bounds.tolist()
+        self.engine_offset = ((min_x + max_x) / 2, max_y) # Where the engine trail starts, relative to the position
 
     def update_position(self):
         """
         Updates the position of the player based on the user input.
 
-        The player's position is updated based on the keys pressed by the user.
+        The player's position is updated based on the controls read from the input source.
         If the left arrow key is pressed and the player's x-coordinate is greater than 0,
         the player moves to the left by the specified speed.
         If the right arrow key is pressed and the player's x-coordinate is less than the screen width,
         the player moves to the right by the specified speed.
-        If the spacebar key is pressed, the player shoots.
+        If the spacebar key is pressed and the fire cooldown has elapsed, the player shoots.
+        With a particle system, the engine trail is emitted below the spaceship every tick.
 
         Parameters:
         - None
@@ -47,51 +64,79 @@ class Player:
         Returns:
         - None
         """
-        pressed_keys = pygame.key.get_pressed() # Get the keys pressed by the user
-        if self.polygon.getPosition().x > 0 and pressed_keys[pygame.K_LEFT]: # Check if the player is within the screen boundaries and the left arrow key is pressed
+        self.previous_position.x = self.polygon.getPosition().x
+        self.previous_position.y = self.polygon.getPosition().y
+        left, right, fire = self.input_source.read() # Get the controls pressed by the user
+        if self.polygon.getPosition().x > 0 and left: # Check if the player is within the screen boundaries and the left arrow key is pressed
             self.polygon.move(-self.speed, 0)
-        if self.polygon.getPosition().x < self.screen_width and pressed_keys[pygame.K_RIGHT]: # Check if the player is within the screen boundaries  and the right arrow key is pressed
+        if self.polygon.getPosition().x < self.screen_width and right: # Check if the player is within the screen boundaries  and the right arrow key is pressed
             self.polygon.move(self.speed, 0)
 
-        if pressed_keys[pygame.K_SPACE]: # Check if the spacebar key is pressed and shoot a bullet
+        if fire and self.fire_timer == 0: # Check if the spacebar key is pressed and shoot a bullet
             self.shoot()
+        elif self.fire_timer > 0: # Not in the tick of the shot, so a cooldown of n waits n whole ticks
+            self.fire_timer -= 1
+        if self.particles is not None:
+            position = self.polygon.getPosition()
+            self.particles.emit((position.x + self.engine_offset[0], position.y + self.engine_offset[1]), self.trail_color, **ENGINE_TRAIL)
 
-    def draw(self, surface):
+    def draw(self, surface, sprite_cache=None, alpha=1.0, simple=False, state=None):
         """
         Draw the player on the given surface.
 
         Args:
             surface (pygame.Surface): The surface to draw the player on.
+            sprite_cache (SpriteCache): Optional cache of rasterized sprites. Without one the player is drawn as a polygon.
+            alpha (float): How far to interpolate between the previous (0) and the current (1) position.
+            simple (bool): Draw the bullets as plain squares, which is cheaper.
+            state (tuple): Optional (previous x, previous y, x, y, bullet state) to draw instead of the
+                player's own position and bullets, e.g. from a snapshot.
+
+        Returns:
+            list: The regions of the surface that were drawn on.
         """
-        points = self.polygon.getPoints() # Get the points of the player's spaceship
-        pygame.draw.polygon(surface, self.color, [(p.x, p.y) for p in points]) # Draw the player's spaceship
-        for bullet in self.bullets:
-            bullet.draw(surface) # Draw the bullets
+        if state is None:
+            position = self.polygon.getPosition()
+            previous_x, previous_y, x, y, bullets = self.previous_position.x, self.previous_position.y, position.x, position.y, None
+        else:
+            previous_x, previous_y, x, y, bullets = state
+        shift_x = (previous_x - x) * (1.0 - alpha) # Offset back towards the previous position
+        shift_y = (previous_y - y) * (1.0 - alpha)
+        if sprite_cache is not None:
+            pivot_x, pivot_y = self.polygon_shape.pivot
+            sprite, offset_x, offset_y = sprite_cache.get(self.shape_key, self.polygon.getOffsets(), self.color, self.polygon.getRotation())
+            rect = surface.blit(sprite, (round(pivot_x + x + shift_x) + offset_x, round(pivot_y + y + shift_y) + offset_y)) # Draw the player's spaceship
+        elif state is None:
+            points = self.polygon.getPoints() # Get the points of the player's spaceship
+            rect = pygame.draw.polygon(surface, self.color, [(p.x + shift_x, p.y + shift_y) for p in points]) # Draw the player's spaceship
+        else: # The live points belong to the simulation, the player never rotates
+            rect = pygame.draw.polygon(surface, self.color, (self.polygon_shape.vertices + (x + shift_x, y + shift_y)).tolist())
+        return [rect] + self.bullets.draw(surface, alpha, simple, bullets) # Draw the bullets
 
     def shoot(self):
         """
         Shoots a bullet from the player's position with a specific velocity.
 
+        The bullet is taken from the player's bullet pool. Nothing happens if the pool is full
+        or the bullet limit is reached.
+
         Returns:
             None
         """
-        bullet_position = Point(self.polygon.getPosition().x, self.polygon.getPosition().y) # Shoot from the player's position
+        if self.bullet_limit is not None and len(self.bullets) >= self.bullet_limit:
+            return
+        position = self.polygon.getPosition() # Shoot from the player's position
         bullet_velocity = -self.bullet_speed  # Use the bullet_speed defined based on difficulty
-        bullet = Bullet(bullet_position, bullet_velocity)
-        self.bullets.append(bullet) # Add the bullet to the list of bullets
+        if self.bullets.spawn(position.x, position.y, bullet_velocity):
+            self.fire_timer = self.fire_cooldown
 
-    def update_bullets(self, surface):
+    def update_bullets(self):
         """
         Update the position of bullets and remove any bullets that have gone off the screen.
 
-        Args:
-            surface: The surface on which the bullets will be drawn.
+        Drawing happens once per frame in `draw`.
 
         Returns:
             None
         """
-        for bullet in self.bullets: # Update the position of each bullet
-            bullet.move()
-            if bullet.position.y < 0:
-                self.bullets.remove(bullet)
-            bullet.draw(surface)
+        self.bullets.update()
@@ -6,6 +6,8 @@ DESCRIPTION: Ah, if only real-life classes were this straight-forward. We'll
  """
 
 class Point:
+	__slots__ = ('x', 'y') # No per-instance __dict__, points are created in large numbers
+
 	def __init__(self, x, y):
 		self.x=x
 		self.y=y
@@ -17,23 +17,254 @@
 from point import Point
 import stdarray
 import math
+import numpy as np
 
-class Polygon:
-    def __init__(self, shape, position, rotation):
+_TRIG_CACHE = {} # rotation in degrees -> (cos, sin), shared by all polygons
+
+def _trig(degrees):
+    trig = _TRIG_CACHE.get(degrees)
+    if trig is None:
+        if len(_TRIG_CACHE) > 3600: # Keep the cache bounded for arbitrary float rotations
+            _TRIG_CACHE.clear()
+        radians = math.radians(degrees)
+        trig = (math.cos(radians), math.sin(radians))
+        _TRIG_CACHE[degrees] = trig
+    return trig
+
+def points_in_polygon(points, vertices):
+    # Crossing-number test of N points against one polygon, evaluated for all
+    # points and edges at once. The edge test is written without a division,
+    # so vertical edges are handled like any other edge.
+    ax = vertices[:, 0]
+    ay = vertices[:, 1]
+    bx = np.roll(ax, -1)
+    return _crossings(points, ax, ay, bx, bx - ax, np.roll(ay, -1) - ay)
+
+def _crossings(points, ax, ay, bx, dx, dy):
+    x = points[:, 0, None]
+    y = points[:, 1, None]
+    straddles = (ax < x) != (bx < x) # Exactly one end of the edge lies left of the point
+    crossings = straddles & (((y - ay) * dx - dy * (x - ax)) * dx > 0)
+    return np.count_nonzero(crossings, axis=1) % 2 == 1
+
+_TEMPLATES = {} # Normalized vertex tuple -> ShapeTemplate, so equal shapes share one template
+
+class ShapeTemplate:
+    # The immutable, shared part of a polygon: its normalized vertices and
+    # everything derived from them, computed once per distinct shape. Polygons
+    # (and the enemy swarm) only add a position and a rotation.
+    __slots__ = ('key', 'area', 'center', 'pivot', 'offsets', 'points', 'bounds', 'radius', 'vertices', '_edges',
+                 '_cells', '_cell_origin', '_column_counts')
+
+    @classmethod
+    def of(cls, shape):
+        # Returns the shared template of a shape given as Points, (x, y) pairs
+        # or a ShapeTemplate. The shape itself is never modified.
+        if isinstance(shape, ShapeTemplate):
+            return shape
         if len(shape) < 2:
             raise ValueError('Polygon must have at least two vertices')
-        self._shape = shape
+        coords = [(p.x, p.y) if isinstance(p, Point) else tuple(p) for p in shape]
+        origin_x = min(x for x, _ in coords)
+        origin_y = min(y for _, y in coords)
+        key = tuple((x - origin_x, y - origin_y) for x, y in coords)
+        template = _TEMPLATES.get(key)
+        if template is None:
+            template = _TEMPLATES[key] = cls(key)
+        return template
+
+    def __init__(self, vertices):
+        # vertices are (x, y) pairs already moved so the smallest x and y are 0;
+        # use ShapeTemplate.of to create templates.
+        self.key = vertices
+        self.area = _findArea(vertices)
+        self.center = _findCenter(vertices, self.area)
+        self.pivot = (self.center[0] / 2, self.center[1] / 2) # Rotation pivot relative to the polygon's position
+        self.offsets = tuple((x - self.center[0], y - self.center[1]) for x, y in vertices) # Vertices relative to the pivot
+        local = np.array(self.offsets, dtype=np.float64) + self.pivot # Vertices relative to the position, unrotated
+        self.points = tuple(tuple(vertex) for vertex in local.tolist())
+        self.bounds = np.concatenate((local.min(axis=0), local.max(axis=0))) # min_x, min_y, max_x, max_y
+        self.radius = float(np.hypot(*np.array(self.offsets).T).max()) # Bounding circle around the pivot, for any rotation
+        ax = local[:, 0]
+        ay = local[:, 1]
+        bx = np.roll(ax, -1)
+        self._edges = (ax, ay, bx, bx - ax, np.roll(ay, -1) - ay)
+        self.vertices = local
+        self._cell_origin = np.floor(self.bounds[:2]) - 1 # One empty cell of padding around the shape
+        self._cells = self._classify_cells()
+        self._column_counts = self._count_columns()
+        for array in (local, self.bounds, self._cell_origin, self._cells, self._column_counts) + self._edges:
+            array.setflags(write=False)
+
+    def _classify_cells(self):
+        # Classifies the one-pixel cells of a grid over the bounding box: 0 lies
+        # outside, 1 inside and 2 is touched by an edge. A cell no edge comes
+        # within half a diagonal of its center is entirely on one side of the
+        # outline, so every point in it gets the same answer as the center.
+        width, height = (np.floor(self.bounds[2:]) - self._cell_origin + 2).astype(int)
+        rows, columns = np.mgrid[0:height, 0:width]
+        centers = np.column_stack((columns.ravel(), rows.ravel())) + self._cell_origin + 0.5
+        ax, ay, bx, dx, dy = self._edges
+        along = np.clip(((centers[:, 0, None] - ax) * dx + (centers[:, 1, None] - ay) * dy) / (dx * dx + dy * dy), 0, 1)
+        distance = np.hypot(ax + along * dx - centers[:, 0, None], ay + along * dy - centers[:, 1, None]).min(axis=1)
+        cells = np.where(distance <= 0.5 ** 0.5 + 1e-9, 2, _crossings(centers, *self._edges).astype(np.int8))
+        cells[(rows == 0).ravel() | (columns == 0).ravel() | (rows == height - 1).ravel() | (columns == width - 1).ravel()] = 0
+        return cells.astype(np.int8).reshape(height, width)
+
+    def _count_columns(self):
+        # Running counts down every column of the cell grid, so the cells a
+        # vertical segment passes are counted with two lookups. An inside cell
+        # counts more than all cells of a column together, an edge cell counts 1.
+        height = len(self._cells)
+        weights = np.where(self._cells == 1, height + 1, self._cells == 2).astype(np.intp)
+        counts = np.zeros((weights.shape[1], height + 1), dtype=np.intp)
+        np.cumsum(weights.T, axis=1, out=counts[:, 1:])
+        return counts.ravel() # Flat, column by column
+
+    def __len__(self):
+        return len(self.key)
+
+    def contains_many(self, points):
+        # points is an array of shape (N, 2) relative to the position of an
+        # unrotated polygon; returns a boolean array of length N. Most points
+        # are answered by looking up their cell; only the ones in cells an edge
+        # passes through go through the crossing-number test.
+        cells = self._cells
+        height, width = cells.shape
+        grid = np.clip(points - self._cell_origin, 0, (width - 1, height - 1)).astype(np.intp) # Clipped first, so truncating floors
+        kinds = cells[grid[:, 1], grid[:, 0]]
+        inside = kinds == 1
+        edge = np.flatnonzero(kinds == 2)
+        if len(edge):
+            inside[edge] = _crossings(points[edge], *self._edges)
+        return inside
+
+    def intersects_segments(self, starts, ends):
+        # starts and ends are arrays of shape (N, 2) relative to the position of
+        # an unrotated polygon; returns a boolean array of length N that is True
+        # where the segment from start to end touches the polygon. Vertical
+        # segments, like the paths of bullets relative to enemies that move
+        # vertically too, are answered by counting the cells they pass in their
+        # column; only the others, and the ones passing edge cells only, are
+        # tested against the edges.
+        height, width = self._cells.shape
+        origin_x, origin_y = self._cell_origin
+        column = np.clip(starts[:, 0] - origin_x, 0, width - 1).astype(np.intp) * (height + 1) # Clipped first, so truncating floors
+        top = np.clip(np.minimum(starts[:, 1], ends[:, 1]) - origin_y, 0, height - 1).astype(np.intp)
+        bottom = np.clip(np.maximum(starts[:, 1], ends[:, 1]) - origin_y, 0, height - 1).astype(np.intp)
+        counts = self._column_counts[column + bottom + 1] - self._column_counts[column + top]
+        vertical = starts[:, 0] == ends[:, 0]
+        hits = vertical & (counts > height) # Passes an inside cell
+        rest = np.flatnonzero(~vertical | ((counts > 0) & ~hits))
+        if len(rest):
+            hits[rest] = _segments_hit(starts[rest], ends[rest], self._edges)
+        return hits
+
+def segments_hit_polygon(starts, ends, vertices):
+    # Tests N segments from starts to ends (arrays of shape (N, 2)) against one
+    # polygon, or against one polygon per segment given as vertices of shape
+    # (N, V, 2), and returns a boolean array of length N that is True where the
+    # segment touches the polygon: where any of its points is inside by
+    # points_in_polygon, so points on the outline count exactly as the
+    # crossing-number test counts them. Repeating the last vertex pads a
+    # polygon to more vertices without changing it.
+    ax = vertices[..., 0]
+    ay = vertices[..., 1]
+    following = np.arange(1, vertices.shape[-2] + 1) % vertices.shape[-2] # Index of the next vertex along the outline
+    bx = ax[..., following]
+    return _segments_hit(starts, ends, (ax, ay, bx, bx - ax, ay[..., following] - ay))
+
+def pad_vertices(vertices, count):
+    # Returns the vertices of shape (V, 2) padded to count vertices by repeating
+    # the last one, so polygons with different numbers of vertices can be
+    # stacked for segments_hit_polygon.
+    return np.concatenate((vertices, np.repeat(vertices[-1:], count - len(vertices), axis=0)))
+
+def _segments_hit(starts, ends, edges):
+    # Inside and outside only change where a segment meets the outline. So a
+    # segment with no vertex of the polygon on it and neither end on the line
+    # of an edge touches the polygon exactly when an end is inside or it
+    # properly crosses an edge. The few others (grazing a vertex, entering
+    # through it, running along an edge or reaching from edge to edge) are
+    # decided by testing points on them as well.
+    ax, ay, bx, dx, dy = edges
+    x0 = starts[:, 0, None]
+    y0 = starts[:, 1, None]
+    x1 = ends[:, 0, None]
+    y1 = ends[:, 1, None]
+    side_start = dx * (y0 - ay) - dy * (x0 - ax) # Sides of the edge's line the segment ends lie on
+    side_end = dx * (y1 - ay) - dy * (x1 - ax)
+    side_a = (x1 - x0) * (ay - y0) - (y1 - y0) * (ax - x0) # Sides of the segment's line the vertices lie on
+    side_b = side_a[:, np.arange(1, side_a.shape[1] + 1) % side_a.shape[1]] # The edge ends at the next vertex
+    hits = ((side_start * side_end < 0) & (side_a * side_b < 0)).any(axis=1)
+    hits |= _crossings(starts, *edges)
+    hits |= _crossings(ends, *edges)
+    touching = (side_start == 0) | (side_end == 0)
+    touching &= (dx != 0) | (dy != 0) # Not on the padding
+    grazing = np.flatnonzero(~hits & (touching | (side_a == 0)).any(axis=1))
+    if len(grazing):
+        edges = tuple(edge[grazing] if edge.ndim > 1 else edge for edge in edges)
+        hits[grazing] = _vertices_hit(starts[grazing], ends[grazing], edges, side_a[grazing] == 0)
+    return hits
+
+def _vertices_hit(starts, ends, edges, on_line):
+    # For segments that touch the outline other than by properly crossing it
+    # (on_line marks the vertices on each segment's line). The pieces between
+    # the vertices on a segment and its ends lie on one side of the outline or
+    # along an edge, so testing the vertices and the midpoints of all pairs of
+    # them and the ends finds a point inside, if there is one.
+    ax, ay = edges[0], edges[1]
+    x0 = starts[:, 0, None]
+    y0 = starts[:, 1, None]
+    sx = ends[:, 0, None] - x0
+    sy = ends[:, 1, None] - y0
+    along = (ax - x0) * sx + (ay - y0) * sy # Where the vertices lie along the segment
+    on = on_line & (along > 0) & (along < sx * sx + sy * sy)
+    corners = np.broadcast_to(np.stack((ax, ay), axis=-1), on.shape + (2,))
+    points = np.concatenate((starts[:, None], ends[:, None], corners), axis=1)
+    used = np.concatenate((np.ones((len(on), 2), dtype=bool), on), axis=1)
+    first, second = np.triu_indices(points.shape[1], 1)
+    samples = np.concatenate((corners, (points[:, first] + points[:, second]) / 2), axis=1)
+    used = np.concatenate((on, used[:, first] & used[:, second]), axis=1)
+    count = samples.shape[1]
+    inside = _crossings(samples.reshape(-1, 2), *(np.repeat(edge, count, axis=0) if edge.ndim > 1 else edge for edge in edges))
+    return (inside.reshape(used.shape) & used).any(axis=1)
+
+def _findArea(vertices):
+    sum = 0
+    for i in range(-1, len(vertices) - 1):
+        sum += vertices[i][0] * vertices[i + 1][1] - vertices[i + 1][0] * vertices[i][1]
+    return abs(sum / 2)
+
+def _findCenter(vertices, area):
+    sum_x = 0
+    sum_y = 0
+    for i in range(-1, len(vertices) - 1):
+        (ax, ay), (bx, by) = vertices[i], vertices[i + 1]
+        sum_x += (ax + bx) * (ax * by - bx * ay)
+        sum_y += (ay + by) * (ax * by - bx * ay)
+    return abs(sum_x / (6 * area)), abs(sum_y / (6 * area))
+
+class Polygon:
+    __slots__ = ('_template', '_pos', '_rot', '_points', '_points_rot', '_points_x', '_points_y')
+
+    def __init__(self, shape, position, rotation):
+        # The shape is looked up as a shared ShapeTemplate, so the area, centroid
+        # and offsets are computed once per distinct shape and the given list is
+        # left untouched. A polygon itself only holds its position and rotation.
+        self._template = ShapeTemplate.of(shape)
         self._pos = position
         self._rot = rotation
 
-        origin = Point(self._shape[0].x, self._shape[0].y)
-        for p in self._shape:
-            if p.x < origin.x: origin.x = p.x
-            if p.y < origin.y: origin.y = p.y
+        # Cached world-space vertex buffer. It is rebuilt when the rotation
+        # changes and only translated when the position changes.
+        self._points = None
+        self._points_rot = None
+        self._points_x = 0
+        self._points_y = 0
 
-        for p in self._shape:
-            p.x -= origin.x
-            p.y -= origin.y
+    def getTemplate(self):
+        return self._template
 
     def getPosition(self):
         return self._pos
@@ -41,6 +272,15 @@ class Polygon:
     def getRotation(self):
         return self._rot
 
+    def getPivot(self):
+        # The point the shape is rotated around in world space.
+        pivot_x, pivot_y = self._template.pivot
+        return Point(pivot_x + self._pos.x, pivot_y + self._pos.y)
+
+    def getOffsets(self):
+        # The vertices relative to the pivot, before rotation.
+        return self._template.offsets
+
     def setPosition(self, position):
         self._pos = position
 
@@ -55,38 +295,57 @@ class Polygon:
         self._rot = (self._rot + degrees) % 360
 
     def getPoints(self):
-        center = self._findCenter()
-        points = stdarray.create1D(len(self._shape))
-        for i in range(len(self._shape)):
-            p = self._shape[i]
-            x = ((p.x - center.x) * math.cos(math.radians(self._rot))) - ((p.y - center.y) * math.sin(math.radians(self._rot))) + center.x / 2 + self._pos.x
-            y = ((p.x - center.x) * math.sin(math.radians(self._rot))) + ((p.y - center.y) * math.cos(math.radians(self._rot))) + center.y / 2 + self._pos.y
-            points[i] = Point(x, y)
-        return points
+        # The returned points are owned by the polygon and are updated in place
+        # on the next call, so callers should not keep them across frames.
+        if self._points is None or self._points_rot != self._rot:
+            self._rebuildPoints()
+        elif self._points_x != self._pos.x or self._points_y != self._pos.y:
+            dx = self._pos.x - self._points_x
+            dy = self._pos.y - self._points_y
+            for p in self._points:
+                p.x += dx
+                p.y += dy
+            self._points_x = self._pos.x
+            self._points_y = self._pos.y
+        return self._points
+
+    def _rebuildPoints(self):
+        cos, sin = _trig(self._rot)
+        offsets = self._template.offsets
+        base_x = self._template.pivot[0] + self._pos.x
+        base_y = self._template.pivot[1] + self._pos.y
+        if self._points is None:
+            self._points = stdarray.create1D(len(offsets))
+            for i in range(len(offsets)):
+                self._points[i] = Point(0, 0)
+        for i in range(len(offsets)):
+            dx, dy = offsets[i]
+            p = self._points[i]
+            p.x = (dx * cos) - (dy * sin) + base_x
+            p.y = (dx * sin) + (dy * cos) + base_y
+        self._points_rot = self._rot
+        self._points_x = self._pos.x
+        self._points_y = self._pos.y
 
     def contains(self, point):
         points = self.getPoints()
         crossingNumber = 0
-        for i in range(-1, len(self._shape) - 1):
-            if (((points[i].x < point.x) and (point.x <= points[i + 1].x)) or
-                    ((points[i + 1].x < point.x) and (point.x <= points[i].x))) and (
-                    point.y > points[i].y + (points[i + 1].y - points[i].y) / (points[i + 1].x - points[i].x) * (
-                    point.x - points[i].x)):
-                crossingNumber += 1
+        for i in range(-1, len(points) - 1):
+            a = points[i]
+            b = points[i + 1]
+            if ((a.x < point.x) and (point.x <= b.x)) or ((b.x < point.x) and (point.x <= a.x)):
+                cross = (point.y - a.y) * (b.x - a.x) - (b.y - a.y) * (point.x - a.x) # No division, safe for vertical edges
+                if cross * (b.x - a.x) > 0:
+                    crossingNumber += 1
         return crossingNumber % 2 == 1
 
-    def _findArea(self):
-        sum = 0
-        for i in range(-1, len(self._shape) - 1):
-            sum += self._shape[i].x * self._shape[i + 1].y - self._shape[i + 1].x * self._shape[i].y
-        return abs(sum / 2)
-
-    def _findCenter(self):
-        sum = Point(0, 0)
-        for i in range(-1, len(self._shape) - 1):
-            sum.x += (self._shape[i].x + self._shape[i + 1].x) * (
-                    self._shape[i].x * self._shape[i + 1].y - self._shape[i + 1].x * self._shape[i].y)
-            sum.y += (self._shape[i].y + self._shape[i + 1].y) * (
-                    self._shape[i].x * self._shape[i + 1].y - self._shape[i + 1].x * self._shape[i].y)
-        area = self._findArea()
-        return Point(abs(sum.x / (6 * area)), abs(sum.y / (6 * area)))
+    def getVertices(self):
+        # The world-space vertices as an array of shape (N, 2).
+        return np.array([(p.x, p.y) for p in self.getPoints()], dtype=np.float64)
+
+    def contains_many(self, points):
+        # points is an array-like of shape (N, 2); returns a boolean array of length N.
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if self._rot == 0: # Test in the template's local space with its precomputed edges
+            return self._template.contains_many(points - (self._pos.x, self._pos.y))
+        return points_in_polygon(points, self.getVertices())
@@ -0,0 +1,186 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+import pygame
+
+class FrameProfiler:
+    def __init__(self, enabled=False, budget_ms=1000 / 30, history=120, timeline_length=36000, idle_phases=('tick_wait',)):
+        """
+        Initializes the FrameProfiler.
+
+        The game loop calls `begin_frame` at the start of a frame, `mark` after every phase
+        and `end_frame` at the end. Each mark records the time since the previous mark as the
+        duration of the named phase. While the profiler is disabled these calls return
+        immediately, so it can stay in production builds. Only the thread that began the
+        frame records marks, so the marks of a simulation thread are ignored.
+
+        Args:
+            enabled (bool): Whether frames are recorded from the start.
+            budget_ms (float): The frame time budget in milliseconds, drawn as a line in the overlay.
+            history (int): The number of frames shown in the overlay graph.
+            timeline_length (int): The number of frames kept for export (20 minutes at 30 FPS by default).
+            idle_phases (tuple): Phases spent waiting, which are left out of the frame times in the graph.
+        """
+        self.enabled = enabled
+        self.show_overlay = enabled
+        self.budget_ms = budget_ms
+        self.idle_phases = idle_phases
+        self.history = deque(maxlen=history) # Busy frame times in milliseconds for the overlay graph
+        self.timeline = deque(maxlen=timeline_length) # (frame index, frame start, [(phase, start, duration), ...]) in seconds
+        self.frame_index = 0
+        self.font = None
+        self._active = False # Whether the current frame is being recorded
+        self._thread = None # The thread recording the current frame
+        self._frame_start = 0
+        self._last = 0
+        self._phases = []
+
+    def toggle_overlay(self):
+        """
+        Shows or hides the overlay. Recording is enabled while the overlay is visible.
+        """
+        self.show_overlay = not self.show_overlay
+        self.enabled = self.show_overlay
+
+    def begin_frame(self):
+        """
+        Starts recording a new frame.
+        """
+        self._active = self.enabled
+        if not self._active:
+            return
+        self._frame_start = self._last = time.perf_counter()
+        self._phases = []
+        self._thread = threading.get_ident()
+
+    def mark(self, phase):
+        """
+        Records the time since the previous mark as the duration of the given phase.
+
+        Args:
+            phase (str): The name of the phase that just finished.
+        """
+        if not self._active or threading.get_ident() != self._thread:
+            return
+        now = time.perf_counter()
+        self._phases.append((phase, self._last, now - self._last))
+        self._last = now
+
+    def end_frame(self):
+        """
+        Finishes recording the current frame.
+        """
+        if not self._active:
+            return
+        idle = sum(duration for phase, _, duration in self._phases if phase in self.idle_phases)
+        self.history.append((self._last - self._frame_start - idle) * 1000)
+        self.timeline.append((self.frame_index, self._frame_start, self._phases))
+        self.frame_index += 1
+        self._active = False
+
+    def phase_averages(self, frames=30):
+        """
+        Returns the average duration of every phase over the last frames.
+
+        Args:
+            frames (int): The number of frames to average over.
+
+        Returns:
+            dict: The average duration in milliseconds per phase, in the order the phases ran.
+        """
+        recent = list(self.timeline)[-frames:]
+        totals = {}
+        for _, _, phases in recent:
+            for phase, _, duration in phases:
+                totals[phase] = totals.get(phase, 0) + duration
+        return {phase: total * 1000 / len(recent) for phase, total in totals.items()}
+
+    def draw_overlay(self, surface, info=()):
+        """
+        Draw the rolling frame time graph and the phase averages on the given surface.
+
+        Args:
+            surface (pygame.Surface): The surface to draw the overlay on.
+            info (tuple): Further (label, text) lines shown above the phase averages.
+
+        Returns:
+            pygame.Rect: The region of the surface that was drawn on, or None if the overlay is hidden.
+        """
+        if not self.show_overlay:
+            return None
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+        width = self.history.maxlen * 2
+        height = 60
+        left = surface.get_width() - width - 10
+        top = surface.get_height() - height - 10
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        scale = height / (self.budget_ms * 2) # The budget line sits in the middle of the graph
+        for i, frame_ms in enumerate(self.history):
+            bar = min(height, int(frame_ms * scale))
+            color = (0, 200, 0) if frame_ms <= self.budget_ms else (220, 0, 0)
+            pygame.draw.line(panel, color, (i * 2, height - 1), (i * 2, height - bar))
+        budget_y = height - int(self.budget_ms * scale)
+        pygame.draw.line(panel, (255, 255, 0), (0, budget_y), (width, budget_y))
+        rect = surface.blit(panel, (left, top))
+        lines = list(info) + [(phase, '%.2f ms' % ms) for phase, ms in self.phase_averages().items()]
+        if self.history:
+            lines.append(('busy', '%.2f ms' % self.history[-1]))
+        y = top - len(lines) * 14 - 4
+        for label, text in lines:
+            rect.union_ip(surface.blit(self.font.render(label, True, (255, 255, 255)), (left, y)))
+            rect.union_ip(surface.blit(self.font.render(text, True, (255, 255, 255)), (left + 120, y)))
+            y += 14
+        return rect
+
+    def export_csv(self, path):
+        """
+        Writes the recorded timeline as CSV, one row per frame and phase.
+
+        Args:
+            path (str): The file to write.
+        """
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['frame', 'phase', 'start_ms', 'duration_ms'])
+            for frame, frame_start, phases in self.timeline:
+                for phase, start, duration in phases:
+                    writer.writerow([frame, phase, '%.4f' % ((start - frame_start) * 1000), '%.4f' % (duration * 1000)])
+
+    def export_json(self, path):
+        """
+        Writes the recorded timeline as JSON, one object per frame.
+
+        Args:
+            path (str): The file to write.
+        """
+        frames = []
+        for frame, frame_start, phases in self.timeline:
+            frames.append({
+                'frame': frame,
+                'start_ms': frame_start * 1000,
+                'phases': {phase: duration * 1000 for phase, _, duration in phases},
+            })
+        with open(path, 'w') as file:
+            json.dump(frames, file)
+
+    def export_chrome_trace(self, path):
+        """
+        Writes the recorded timeline in the Chrome trace event format (chrome://tracing, Perfetto).
+
+        Args:
+            path (str): The file to write.
+        """
+        events = []
+        for frame, frame_start, phases in self.timeline:
+            if phases:
+                frame_end = phases[-1][1] + phases[-1][2]
+                events.append({'name': 'frame %d' % frame, 'ph': 'X', 'pid': 1, 'tid': 1,
+                               'ts': frame_start * 1e6, 'dur': (frame_end - frame_start) * 1e6})
+            for phase, start, duration in phases:
+                events.append({'name': phase, 'ph': 'X', 'pid': 1, 'tid': 2, 'ts': start * 1e6, 'dur': duration * 1e6})
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
@@ -0,0 +1,56 @@
+import pygame
+
+class DirtyRectRenderer:
+    def __init__(self, window, render_background):
+        """
+        Initializes a DirtyRectRenderer.
+
+        Instead of redrawing and pushing the whole window every frame, the renderer
+        restores only the regions drawn in the previous frame from a cached backdrop
+        and passes the previous and current regions to `pygame.display.update`.
+        This requires a static background.
+
+        Args:
+            window (pygame.Surface): The window surface.
+            render_background (callable): Draws the static background onto the surface it is given.
+        """
+        self.window = window
+        self.render_background = render_background
+        self.backdrop = None
+        self.previous_rects = []
+        self.full_update = True
+
+    def invalidate(self):
+        """
+        Forces a full redraw on the next frame, e.g. after another screen was shown in the window.
+        """
+        self.backdrop = None
+
+    def erase(self):
+        """
+        Restores the regions drawn in the previous frame from the backdrop.
+
+        On the first frame (or after `invalidate`) the backdrop is rendered and the whole window is redrawn.
+        """
+        if self.backdrop is None:
+            self.backdrop = pygame.Surface(self.window.get_size()).convert(self.window)
+            self.render_background(self.backdrop)
+            self.window.blit(self.backdrop, (0, 0))
+            self.full_update = True
+            return
+        for rect in self.previous_rects:
+            self.window.blit(self.backdrop, rect, rect) # Copy only this region of the backdrop
+
+    def present(self, rects):
+        """
+        Pushes the changed regions of the window to the display.
+
+        Args:
+            rects (list): The regions drawn in the current frame.
+        """
+        if self.full_update:
+            pygame.display.update()
+            self.full_update = False
+        else:
+            pygame.display.update(self.previous_rects + rects)
+        self.previous_rects = rects
@@ -0,0 +1,185 @@
+import argparse
+import json
+import struct
+import time
+
+MAGIC = b'ASTR'
+VERSION = 1
+HEADER = struct.Struct('<4sBqHB') # magic, version, seed, tick rate, length of the difficulty name
+MAX_RUN = 32 # Ticks per run byte: 3 bits of input, 5 bits of run length - 1
+
+def _pack(left, right, fire):
+    return (1 if left else 0) | (2 if right else 0) | (4 if fire else 0)
+
+def _unpack(bits):
+    return bool(bits & 1), bool(bits & 2), bool(bits & 4)
+
+class ReplayWriter:
+    def __init__(self, path, seed, difficulty, tick_rate):
+        """
+        Initializes a ReplayWriter and writes the replay header.
+
+        The per-tick input (left, right, fire) is run-length encoded while it is
+        recorded: every byte holds 3 input bits and a run of up to 32 ticks, so a
+        held key costs one byte per 32 ticks. Bytes are streamed to the file as
+        runs complete.
+
+        Args:
+            path (str): The file to write.
+            seed (int): The seed the round was started with.
+            difficulty (str): The difficulty level of the round.
+            tick_rate (int): The simulation ticks per second.
+        """
+        self.file = open(path, 'wb')
+        name = difficulty.encode('utf-8')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, tick_rate, len(name)) + name)
+        self.bits = None
+        self.run = 0
+        self.ticks = 0
+
+    def write(self, left, right, fire):
+        """
+        Records the input of one tick.
+
+        Args:
+            left (bool): Whether left was pressed.
+            right (bool): Whether right was pressed.
+            fire (bool): Whether fire was pressed.
+        """
+        bits = _pack(left, right, fire)
+        if bits != self.bits or self.run == MAX_RUN:
+            self._flush_run()
+            self.bits = bits
+        self.run += 1
+        self.ticks += 1
+
+    def _flush_run(self):
+        if self.run:
+            self.file.write(bytes(((self.bits << 5) | (self.run - 1),)))
+        self.run = 0
+
+    def close(self):
+        """
+        Writes the last run and closes the file.
+        """
+        if not self.file.closed:
+            self._flush_run()
+            self.file.close()
+
+class ReplayReader:
+    def __init__(self, path):
+        """
+        Initializes a ReplayReader by reading the header and the recorded runs.
+
+        Args:
+            path (str): The replay file.
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, version, self.seed, self.tick_rate, name_length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('%s is not a version %d replay file' % (path, VERSION))
+        start = HEADER.size + name_length
+        self.difficulty = data[HEADER.size:start].decode('utf-8')
+        self.runs = [(_unpack(byte >> 5), (byte & 31) + 1) for byte in data[start:]]
+        self.tick_count = sum(run for _, run in self.runs)
+
+class RecordingInput:
+    def __init__(self, input_source, writer):
+        """
+        Initializes a RecordingInput that passes through another input source and records it.
+
+        Args:
+            input_source: The input source whose controls are recorded.
+            writer (ReplayWriter): The writer the controls are recorded to.
+        """
+        self.input_source = input_source
+        self.writer = writer
+
+    def read(self):
+        """
+        Returns the controls of the wrapped input source and records them.
+
+        Returns:
+            tuple: (left, right, fire) as booleans.
+        """
+        left, right, fire = self.input_source.read()
+        self.writer.write(left, right, fire)
+        return left, right, fire
+
+class ReplayInput:
+    def __init__(self, reader):
+        """
+        Initializes a ReplayInput that plays back the controls of a replay, one entry per tick.
+
+        Args:
+            reader (ReplayReader): The replay to play back.
+        """
+        self.runs = iter(reader.runs)
+        self.controls = (False, False, False)
+        self.remaining = 0
+
+    def read(self):
+        """
+        Returns the controls for the current tick and advances to the next one.
+        Once the replay runs out, no keys are pressed.
+
+        Returns:
+            tuple: (left, right, fire) as booleans.
+        """
+        if self.remaining == 0:
+            self.controls, self.remaining = next(self.runs, ((False, False, False), 1))
+        self.remaining -= 1
+        return self.controls
+
+def play(path, render=False, trace_path=None):
+    """
+    Re-runs the round recorded in a replay file.
+
+    Args:
+        path (str): The replay file.
+        render (bool): Play back in real time in a window. Otherwise the replay is run headless at maximum speed.
+        trace_path (str): With rendering, write the profiled frame timeline as a Chrome trace to this file.
+
+    Returns:
+        dict: The final score and timing statistics of the playback.
+    """
+    from game import AsteroidAvoidanceGame # Imported here because the game imports this module for recording
+    reader = ReplayReader(path)
+    game = AsteroidAvoidanceGame(headless=not render, input_source=ReplayInput(reader),
+                                 profile=trace_path is not None, tick_rate=reader.tick_rate)
+    game.reset(reader.difficulty, reader.seed)
+    start = time.perf_counter()
+    if render:
+        game.run_game_loop(max_ticks=reader.tick_count)
+    else:
+        while not game.game_over and game.frame_count < reader.tick_count:
+            game.step()
+    wall_time = time.perf_counter() - start
+    if trace_path is not None:
+        game.profiler.export_chrome_trace(trace_path)
+    return {
+        'difficulty': reader.difficulty,
+        'seed': reader.seed,
+        'score': game.score,
+        'game_over': game.game_over,
+        'ticks': game.frame_count,
+        'recorded_ticks': reader.tick_count,
+        'wall_time': wall_time,
+        'ticks_per_second': game.frame_count / wall_time if wall_time > 0 else float('inf'),
+        **game.quality_stats(),
+    }
+
+def main():
+    """
+    Plays back a replay file from the command line and prints the result as JSON.
+    """
+    parser = argparse.ArgumentParser(description='Play back a recorded Asteroid Avoidance round.')
+    parser.add_argument('path', help='the replay file')
+    parser.add_argument('--render', action='store_true', help='play back in real time in a window instead of headless')
+    parser.add_argument('--trace', help='with --render, write the frame timeline as a Chrome trace to this file')
+    args = parser.parse_args()
+    print(json.dumps(play(args.path, args.render, args.trace), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import pygame
+from difficulty_menu import DifficultyMenu
+
+class Scene:
+    """
+    A screen of the game, such as the menu or a round, driven by a SceneManager.
+
+    Idle scenes only change in response to events, so the main loop sleeps until the
+    next event while they are on top. Other scenes are updated once per loop iteration.
+    """
+    idle = False
+
+    def __init__(self, game):
+        """
+        Initializes the Scene.
+
+        Args:
+            game (AsteroidAvoidanceGame): The game the scene belongs to.
+        """
+        self.game = game
+        self.manager = None
+
+    def enter(self):
+        """
+        Called when the scene is pushed onto the stack.
+        """
+
+    def exit(self):
+        """
+        Called when the scene is removed from the stack.
+        """
+
+    def resume(self):
+        """
+        Called when the scene is on top again after the scene above it was popped.
+        """
+        self.enter()
+
+    def handle_event(self, event):
+        """
+        Handles a single event.
+
+        Args:
+            event (pygame.event.Event): The event to handle.
+        """
+
+    def update(self):
+        """
+        Advances the scene by one iteration of the main loop. Not called for idle scenes.
+        """
+
+class SceneManager:
+    def __init__(self, scene):
+        """
+        Initializes a SceneManager with the first scene.
+
+        Args:
+            scene (Scene): The scene at the bottom of the stack.
+        """
+        self.stack = []
+        self.running = False
+        self.push(scene)
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    def push(self, scene):
+        """
+        Puts a scene on top of the stack. The scene below stays on the stack and is resumed when this one is popped.
+
+        Args:
+            scene (Scene): The new scene.
+        """
+        scene.manager = self
+        self.stack.append(scene)
+        scene.enter()
+
+    def pop(self):
+        """
+        Removes the top scene and resumes the one below.
+        """
+        self.stack.pop().exit()
+        if self.stack:
+            self.stack[-1].resume()
+
+    def replace(self, scene):
+        """
+        Replaces the top scene with another one.
+
+        Args:
+            scene (Scene): The new scene.
+        """
+        self.stack.pop().exit()
+        self.push(scene)
+
+    def run(self):
+        """
+        Runs the main loop until the window is closed or the stack is empty.
+
+        While an idle scene is on top the loop blocks in `pygame.event.wait`, so it uses
+        no CPU until the next input, timer or window event.
+        """
+        self.running = True
+        while self.running and self.stack:
+            scene = self.stack[-1]
+            if scene.idle:
+                events = [pygame.event.wait()] + pygame.event.get()
+            else:
+                events = pygame.event.get()
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.quit()
+                    pygame.quit()
+                    return
+                scene.handle_event(event)
+                if self.top is not scene: # The event changed the scene, leave the rest to the new one
+                    break
+            if self.top is scene and not scene.idle:
+                scene.update()
+
+    def quit(self):
+        """
+        Exits all scenes and stops the main loop.
+        """
+        self.running = False
+        while self.stack:
+            self.stack.pop().exit()
+
+class MenuScene(Scene):
+    """
+    The difficulty menu. Selecting a difficulty starts a round on top of it.
+    """
+    idle = True
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.menu = DifficultyMenu(game.window, game.screen_width, game.screen_height, game.text_cache) # Created once and reused for every round
+
+    def enter(self):
+        self.game.assets.play_music('menu') # Keeps playing if it already is
+        self.menu.display_menu()
+
+    def handle_event(self, event):
+        difficulty = self.menu.handle_event(event)
+        if difficulty is not None:
+            self.manager.push(GameplayScene(self.game, difficulty))
+
+class GameplayScene(Scene):
+    """
+    One round of the game. It is replaced by the game over screen once the player is hit.
+    """
+
+    def __init__(self, game, difficulty):
+        super().__init__(game)
+        self.difficulty = difficulty
+
+    def enter(self):
+        pygame.event.set_blocked(pygame.MOUSEMOTION) # Not used while playing
+        self.game.start_round(self.difficulty)
+
+    def exit(self):
+        pygame.event.set_allowed(pygame.MOUSEMOTION)
+        self.game.end_round()
+
+    def handle_event(self, event):
+        self.game.handle_event(event)
+
+    def update(self):
+        self.game.run_frame(handle_events=False)
+        if self.game.game_over:
+            self.manager.replace(GameOverScene(self.game))
+
+class GameOverScene(Scene):
+    """
+    The game over screen. It returns to the menu after a while, or earlier on a key press or click.
+    """
+    idle = True
+    DONE = pygame.event.custom_type()
+
+    def __init__(self, game, duration_ms=2000):
+        super().__init__(game)
+        self.duration_ms = duration_ms
+
+    def enter(self):
+        self.game.display_game_over()
+        pygame.time.set_timer(self.DONE, self.duration_ms, loops=1) # Wakes the main loop when the time is up
+
+    def exit(self):
+        pygame.time.set_timer(self.DONE, 0)
+
+    def handle_event(self, event):
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.game.display_game_over()
+        elif event.type in (self.DONE, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            self.manager.pop()
@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+
+class Snapshot:
+    __slots__ = ('tick', 'time', 'score', 'game_over', 'player', 'enemies', 'particles', 'background',
+                 '_bullets', '_enemies', '_colors', '_particles', '_particle_colors', '_fades')
+
+    def __init__(self, bullet_capacity, enemy_capacity, particle_capacity=0):
+        """
+        Initializes a Snapshot, the state of one simulation tick needed to draw a frame.
+
+        A snapshot holds copies of the previous and current positions of the player, the
+        bullets and the enemies, the enemy colors, the particles, the background offsets and the score, so
+        the frame can be drawn and interpolated without touching the live game objects.
+        The arrays are allocated once with the capacity of the pools and refilled by `capture`.
+
+        Args:
+            bullet_capacity (int): The maximum number of live bullets.
+            enemy_capacity (int): The maximum number of alive enemies.
+            particle_capacity (int): The maximum number of live particles.
+        """
+        self.tick = 0
+        self.time = 0.0 # When the tick was due, in time.perf_counter seconds
+        self.score = 0
+        self.game_over = False
+        self.player = None # (previous x, previous y, x, y, (previous bullet positions, bullet positions))
+        self.enemies = None # (previous positions, positions, colors) of the alive enemies
+        self.particles = None # (positions, velocities, colors, remaining lifetime fractions) of the live particles
+        self.background = () # The offset of every background strip
+        self._bullets = np.zeros((2, bullet_capacity, 2), dtype=np.float64)
+        self._enemies = np.zeros((2, enemy_capacity, 2), dtype=np.float64)
+        self._colors = np.zeros((enemy_capacity, 3), dtype=np.uint8)
+        self._particles = np.zeros((2, particle_capacity, 2), dtype=np.float32) # Positions and velocities
+        self._fades = np.zeros(particle_capacity, dtype=np.float32)
+        self._particle_colors = np.zeros((particle_capacity, 3), dtype=np.uint8)
+
+    def capture(self, game, due=None):
+        """
+        Copies the drawable state of the game into the snapshot.
+
+        Args:
+            game (AsteroidAvoidanceGame): The game to capture.
+            due (float): When the tick was due, in time.perf_counter seconds. Defaults to now.
+        """
+        self.tick = game.frame_count
+        self.time = time.perf_counter() if due is None else due
+        self.score = game.score
+        self.game_over = game.game_over
+        player = game.player
+        bullets = player.bullets
+        count = bullets.count
+        np.copyto(self._bullets[0, :count], bullets.previous_positions[:count])
+        np.copyto(self._bullets[1, :count], bullets.positions[:count])
+        position = player.polygon.getPosition()
+        self.player = (player.previous_position.x, player.previous_position.y, position.x, position.y,
+                       (self._bullets[0, :count], self._bullets[1, :count]))
+        swarm = game.enemy_swarm
+        indices = swarm.indices()
+        count = len(indices)
+        np.take(swarm.previous_positions, indices, axis=0, out=self._enemies[0, :count])
+        np.take(swarm.positions, indices, axis=0, out=self._enemies[1, :count])
+        np.take(swarm.colors, indices, axis=0, out=self._colors[:count])
+        self.enemies = (self._enemies[0, :count], self._enemies[1, :count], self._colors[:count])
+        if game.particles is not None:
+            particles = game.particles
+            count = particles.count
+            np.copyto(self._particles[0, :count], particles.positions[:count])
+            np.copyto(self._particles[1, :count], particles.velocities[:count])
+            np.divide(particles.lifetimes[:count], particles.durations[:count], out=self._fades[:count])
+            np.copyto(self._particle_colors[:count], particles.colors[:count])
+            self.particles = (self._particles[0, :count], self._particles[1, :count], self._particle_colors[:count],
+                              self._fades[:count])
+        if game.background is not None:
+            self.background = tuple(layer[3] for layer in game.background.strips)
+
+class SnapshotBuffer:
+    def __init__(self, create):
+        """
+        Initializes a SnapshotBuffer, a triple buffer passing snapshots from the simulation to the renderer.
+
+        The writer fills the back snapshot and publishes it, which swaps it with the ready one.
+        The reader swaps the ready snapshot to the front if a newer one was published. Neither
+        side waits for the other: the writer never touches the snapshot the reader holds, and
+        the reader always gets the latest complete one. Only the swaps take the lock.
+
+        Args:
+            create (callable): Returns a new, empty snapshot. Called three times.
+        """
+        self.snapshots = [create() for _ in range(3)]
+        self._back, self._ready, self._front = 0, 1, 2
+        self._fresh = False # Whether the ready snapshot is newer than the front one
+        self._lock = threading.Lock()
+
+    def back(self):
+        """
+        Returns the snapshot the writer fills next.
+
+        Returns:
+            Snapshot: The back snapshot.
+        """
+        return self.snapshots[self._back]
+
+    def publish(self):
+        """
+        Makes the filled back snapshot the latest one.
+        """
+        with self._lock:
+            self._back, self._ready = self._ready, self._back
+            self._fresh = True
+
+    def latest(self):
+        """
+        Returns the latest published snapshot. It stays unchanged until the next call.
+
+        Returns:
+            Snapshot: The front snapshot.
+        """
+        with self._lock:
+            if self._fresh:
+                self._front, self._ready = self._ready, self._front
+                self._fresh = False
+        return self.snapshots[self._front]
+
+class SimulationThread(threading.Thread):
+    def __init__(self, game, max_ticks=None):
+        """
+        Initializes a SimulationThread that runs the game's simulation ticks at its tick rate.
+
+        Every tick updates the player, the bullets and the enemies and checks the collisions
+        through `game.step`, then captures a snapshot and publishes it to `buffer`. The ticks
+        are scheduled on a fixed clock, so they keep their cadence while the main thread is
+        drawing a slow frame; after a stall of more than 0.25 s the clock is reset instead
+        of catching up. A first snapshot of the current state is published right away.
+
+        Args:
+            game (AsteroidAvoidanceGame): The game to simulate. It must not be stepped by any other thread.
+            max_ticks (int): Optional number of simulation ticks after which the thread stops.
+        """
+        super().__init__(name='simulation', daemon=True)
+        self.game = game
+        self.max_ticks = max_ticks
+        capacities = (game.player.bullets.capacity, game.enemy_swarm.capacity,
+                      0 if game.particles is None else game.particles.capacity)
+        self.buffer = SnapshotBuffer(lambda: Snapshot(*capacities))
+        self.buffer.back().capture(game)
+        self.buffer.publish()
+        self.stopping = threading.Event()
+        self.tick_times = deque(maxlen=30) # Busy time of the last ticks in milliseconds
+        self.stalls = 0
+
+    def run(self):
+        game = self.game
+        tick_length = 1.0 / game.TICK_RATE
+        due = time.perf_counter() + tick_length
+        while not game.game_over and (self.max_ticks is None or game.frame_count < self.max_ticks):
+            delay = due - time.perf_counter()
+            if delay > 0:
+                if self.stopping.wait(delay):
+                    break
+            elif self.stopping.is_set():
+                break
+            elif delay < -0.25: # Don't try to catch up after long stalls
+                due = time.perf_counter()
+                self.stalls += 1
+            start = time.perf_counter()
+            game.step()
+            snapshot = self.buffer.back()
+            snapshot.capture(game, due)
+            self.buffer.publish()
+            self.tick_times.append((time.perf_counter() - start) * 1000)
+            due += tick_length
+
+    def stop(self):
+        """
+        Stops the simulation after the current tick and waits for the thread to finish.
+        """
+        self.stopping.set()
+        if self.is_alive():
+            self.join()
+
+    def stats(self):
+        """
+        Returns the timing of the simulation.
+
+        Returns:
+            dict: The average busy time of the last ticks in milliseconds and the number of stalls.
+        """
+        return {
+            'tick_ms': sum(self.tick_times) / len(self.tick_times) if self.tick_times else 0.0,
+            'stalls': self.stalls,
+        }
@@ -0,0 +1,75 @@
+import math
+from collections import OrderedDict
+import pygame
+
+class SpriteCache:
+    def __init__(self, max_entries=1024, rotation_buckets=36):
+        """
+        Initializes a SpriteCache.
+
+        Every (shape, color, rotation bucket) combination is rasterized once into a
+        converted, RLE-accelerated surface with a color key. The polygons are solid,
+        so a color key is exact and blits much faster than per-pixel alpha. Drawing
+        a polygon then becomes a single blit. The least recently used sprites are evicted once the cache
+        holds more than `max_entries` sprites.
+
+        Args:
+            max_entries (int): The maximum number of cached sprites.
+            rotation_buckets (int): The number of rotation steps a full turn is divided into.
+        """
+        self.max_entries = max_entries
+        self.rotation_buckets = rotation_buckets
+        self.sprites = OrderedDict() # (shape key, color, bucket) -> (surface, offset x, offset y)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def get(self, shape_key, vertices, color, rotation=0):
+        """
+        Returns the sprite for the given shape, color and rotation, rasterizing it if necessary.
+
+        Args:
+            shape_key: A hashable key identifying the shape.
+            vertices (list): The shape's vertices as (x, y) pairs relative to the anchor point the sprite is drawn at.
+            color (tuple): The fill color.
+            rotation (float): The rotation in degrees around the anchor point.
+
+        Returns:
+            tuple: (surface, offset_x, offset_y). The sprite is drawn at anchor + offset.
+        """
+        bucket = int(round(rotation * self.rotation_buckets / 360)) % self.rotation_buckets
+        key = (shape_key, color, bucket)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+        self.misses += 1
+        sprite = self._rasterize(vertices, color, bucket * 360 / self.rotation_buckets)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_entries:
+            self.sprites.popitem(last=False) # Evict the least recently used sprite
+        return sprite
+
+    def _rasterize(self, vertices, color, rotation):
+        cos = math.cos(math.radians(rotation))
+        sin = math.sin(math.radians(rotation))
+        rotated = [(x * cos - y * sin, x * sin + y * cos) for x, y in vertices]
+        left = math.floor(min(x for x, _ in rotated))
+        top = math.floor(min(y for _, y in rotated))
+        width = math.ceil(max(x for x, _ in rotated)) - left + 1
+        height = math.ceil(max(y for _, y in rotated)) - top + 1
+        surface = pygame.Surface((width, height))
+        key = (0, 0, 0) if color != (0, 0, 0) else (255, 0, 255)
+        surface.fill(key)
+        pygame.draw.polygon(surface, color, [(x - left, y - top) for x, y in rotated])
+        surface.set_colorkey(key, pygame.RLEACCEL)
+        return surface.convert(), left, top
+
+    def clear(self):
+        """
+        Removes all cached sprites.
+        """
+        self.sprites.clear()
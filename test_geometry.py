@@ -0,0 +1,188 @@
+from fractions import Fraction
+import numpy as np
+from enemy_swarm import EnemySwarm
+from point import Point
+from polygon import Polygon, ShapeTemplate, points_in_polygon, segments_hit_polygon
+
+ENEMY = [(0, -25), (15, -10), (20, 0), (15, 10), (0, 25), (-15, 10), (-20, 0), (-15, -10)] # The enemy shape of the game
+PLUS = [(4, 0), (8, 0), (8, 4), (12, 4), (12, 8), (8, 8), (8, 12), (4, 12), (4, 8), (0, 8), (0, 4), (4, 4)] # Concave, vertical edges
+NOTCHED = [(0, 0), (12, 0), (12, 4), (6, 4), (6, 8), (12, 8), (12, 12), (0, 12)]
+TRIANGLE = [(0, 0), (10, 5), (0, 10)] # Its tip at (10, 5) points right
+
+def _inside(x, y, vertices):
+    # The crossing-number rule of points_in_polygon for one point, exact for Fractions.
+    inside = False
+    for (ax, ay), (bx, by) in zip(vertices, vertices[1:] + vertices[:1]):
+        if (ax < x) != (bx < x) and ((y - ay) * (bx - ax) - (by - ay) * (x - ax)) * (bx - ax) > 0:
+            inside = not inside
+    return inside
+
+def _segment_hits(start, end, vertices):
+    # Whether any point of the segment is inside by the crossing-number rule,
+    # in exact arithmetic. Inside and outside only change where the segment
+    # meets the outline, so the ends, those points and the midpoints between
+    # them decide it.
+    vertices = [(Fraction(x), Fraction(y)) for x, y in vertices]
+    (x0, y0), (x1, y1) = [(Fraction(x), Fraction(y)) for x, y in (start, end)]
+    sx, sy = x1 - x0, y1 - y0
+    cuts = {Fraction(0), Fraction(1)}
+    for (ax, ay), (bx, by) in zip(vertices, vertices[1:] + vertices[:1]):
+        ex, ey = bx - ax, by - ay
+        denominator = sx * ey - sy * ex
+        if denominator != 0:
+            t = ((ax - x0) * ey - (ay - y0) * ex) / denominator
+            u = ((ax - x0) * sy - (ay - y0) * sx) / denominator
+            if 0 <= t <= 1 and 0 <= u <= 1:
+                cuts.add(t)
+        elif (sx or sy) and (ax - x0) * sy - (ay - y0) * sx == 0: # Along the edge's line
+            for px, py in ((ax, ay), (bx, by)):
+                t = ((px - x0) * sx + (py - y0) * sy) / (sx * sx + sy * sy)
+                if 0 <= t <= 1:
+                    cuts.add(t)
+    cuts = sorted(cuts)
+    samples = cuts + [(a + b) / 2 for a, b in zip(cuts, cuts[1:])]
+    return any(_inside(x0 + t * sx, y0 + t * sy, vertices) for t in samples)
+
+def _star(rng, corners=9):
+    # A random simple polygon, star-shaped around the origin.
+    angles = np.sort(rng.uniform(0, 2 * np.pi, corners))
+    radii = rng.uniform(5, 20, corners)
+    return np.column_stack((radii * np.cos(angles), radii * np.sin(angles)))
+
+def _grid_segments(rng, vertices, count, step=0.5):
+    # Segments between points of a grid through the vertices, about a third of
+    # them vertical and a third horizontal, so many run through vertices,
+    # along edges or end on the outline.
+    low = np.floor(vertices.min(axis=0)) - 2
+    high = np.ceil(vertices.max(axis=0)) + 2
+    starts = low + rng.integers(0, ((high - low) / step).astype(int) + 1, (count, 2)) * step
+    ends = low + rng.integers(0, ((high - low) / step).astype(int) + 1, (count, 2)) * step
+    kind = rng.integers(0, 3, count)
+    ends[kind == 0, 0] = starts[kind == 0, 0]
+    ends[kind == 1, 1] = starts[kind == 1, 1]
+    return starts, ends
+
+def test_inside_reference_matches_points_in_polygon():
+    rng = np.random.default_rng(0)
+    for vertices in (np.array(ENEMY, dtype=float), np.array(NOTCHED, dtype=float), _star(rng)):
+        points = np.concatenate((rng.uniform(-25, 25, (300, 2)), np.mgrid[-21:21:0.5, -26:26:0.5].reshape(2, -1).T))
+        expected = [_inside(x, y, vertices.tolist()) for x, y in points.tolist()]
+        assert points_in_polygon(points, vertices).tolist() == expected
+
+def test_contains_many_matches_points_in_polygon():
+    rng = np.random.default_rng(1)
+    for shape in (ENEMY, PLUS, NOTCHED, _star(rng).tolist(), _star(rng, 5).tolist()):
+        template = ShapeTemplate.of(shape)
+        low, high = template.bounds[:2] - 2, template.bounds[2:] + 2
+        on_grid = np.mgrid[low[0]:high[0]:0.25, low[1]:high[1]:0.25].reshape(2, -1).T # Includes vertices and points on edges
+        points = np.concatenate((rng.uniform(low, high, (2000, 2)), on_grid, template.vertices))
+        assert np.array_equal(template.contains_many(points), points_in_polygon(points, template.vertices))
+
+def test_segments_hit_polygon_matches_reference_on_random_segments():
+    rng = np.random.default_rng(2)
+    for vertices in (_star(rng), _star(rng, 4), np.array(NOTCHED, dtype=float)):
+        starts = rng.uniform(-25, 25, (400, 2))
+        ends = starts + rng.normal(0, 10, (400, 2))
+        expected = [_segment_hits(start, end, vertices.tolist()) for start, end in zip(starts.tolist(), ends.tolist())]
+        assert segments_hit_polygon(starts, ends, vertices).tolist() == expected
+
+def test_segments_hit_polygon_matches_reference_on_the_outline():
+    rng = np.random.default_rng(3)
+    for shape in (NOTCHED, TRIANGLE, PLUS):
+        vertices = np.array(shape, dtype=float)
+        starts, ends = _grid_segments(rng, vertices, 1500)
+        expected = [_segment_hits(start, end, shape) for start, end in zip(starts.tolist(), ends.tolist())]
+        assert segments_hit_polygon(starts, ends, vertices).tolist() == expected
+
+def test_segments_hit_polygon_tangent_segments():
+    triangle = np.array(TRIANGLE, dtype=float)
+    notched = np.array(NOTCHED, dtype=float)
+    cases = [ # Points on left and top edges count as outside, on right and bottom edges as inside
+        (triangle, (10, 0), (10, 10), False), # Grazes the tip from the right
+        (triangle, (0, -5), (0, 15), False), # Along the left edge
+        (triangle, (-5, 10), (5, 0), True), # Through the vertex (0, 10) into the inside
+        (notched, (0, -1), (0, 13), False), # Along the left edge
+        (notched, (12, -1), (12, 5), True), # Along the right edge
+        (notched, (6, 3), (6, 9), True), # Along the right edge of the notch
+        (notched, (-1, 0), (13, 0), False), # Along the top edge
+        (notched, (-1, 12), (13, 12), True), # Along the bottom edge
+        (notched, (12, 0), (0, 12), True), # Through two vertices, inside between them
+        (notched, (13, 6), (6, 6), True), # Ends on the right edge of the notch
+        (notched, (13, 6), (7, 6), False), # Stops short of it
+        (notched, (12, 6), (12, 8), False), # Along the opening of the notch to its lower corner
+        (notched, (12, 4), (12, 8), True), # From its upper corner, which counts as inside
+        (notched, (6, 8), (12, 2), True), # From edge to edge through the inside
+    ]
+    for vertices, start, end, expected in cases:
+        assert _segment_hits(start, end, vertices.tolist()) == expected, (start, end)
+        assert segments_hit_polygon(np.array([start], dtype=float), np.array([end], dtype=float), vertices)[0] == expected, (start, end)
+
+def test_segments_hit_polygon_with_one_padded_polygon_per_segment():
+    rng = np.random.default_rng(4)
+    polygons = [np.array(NOTCHED, dtype=float), np.array(TRIANGLE, dtype=float), _star(rng, 6)]
+    starts, ends = _grid_segments(rng, polygons[0], 300)
+    which = rng.integers(0, len(polygons), len(starts))
+    padded = np.array([np.concatenate((vertices, np.repeat(vertices[-1:], 8 - len(vertices), axis=0))) for vertices in polygons])
+    expected = [segments_hit_polygon(starts[index:index + 1], ends[index:index + 1], polygons[which[index]])[0] for index in range(len(starts))]
+    assert segments_hit_polygon(starts, ends, padded[which]).tolist() == expected
+
+def test_intersects_segments_matches_reference():
+    rng = np.random.default_rng(5)
+    for shape in (ENEMY, PLUS):
+        template = ShapeTemplate.of(shape)
+        starts, ends = _grid_segments(rng, template.vertices, 1500)
+        expected = [_segment_hits(start, end, template.vertices.tolist()) for start, end in zip(starts.tolist(), ends.tolist())]
+        assert template.intersects_segments(starts, ends).tolist() == expected
+
+def _swarm(rng, count):
+    swarm = EnemySwarm(ENEMY, count, 500, 600, rng)
+    for _ in range(count):
+        swarm.spawn(rng.uniform(2, 9), x=rng.uniform(40, 460), y=rng.uniform(0, 560))
+    swarm.move()
+    return swarm
+
+def test_collide_points_matches_brute_force():
+    rng = np.random.default_rng(6)
+    for enemies, count in ((300, 400), (3, 20)): # With and without the sorted broad phase
+        swarm = _swarm(rng, enemies)
+        points = rng.uniform((0, 0), (500, 600), (count, 2))
+        point_indices, enemy_indices = swarm.collide_points(points)
+        expected = {(point, enemy) for enemy in swarm.indices()
+                    for point in np.flatnonzero(points_in_polygon(points - swarm.positions[enemy], swarm.template_vertices))}
+        assert set(zip(point_indices.tolist(), enemy_indices.tolist())) == expected
+        assert np.all(np.diff(point_indices) >= 0)
+
+def test_collide_segments_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for enemies, count in ((300, 400), (3, 20)):
+        swarm = _swarm(rng, enemies)
+        ends = rng.uniform((0, 0), (500, 600), (count, 2))
+        starts = ends + np.where(rng.random((count, 1)) < 0.5, (0, 12), rng.normal(0, 15, (count, 2))) # Bullet paths and others
+        segment_indices, enemy_indices = swarm.collide_segments(starts, ends)
+        expected = {(segment, enemy) for enemy in swarm.indices()
+                    for segment in np.flatnonzero(segments_hit_polygon(starts - swarm.previous_positions[enemy],
+                                                                       ends - swarm.positions[enemy], swarm.template_vertices))}
+        assert set(zip(segment_indices.tolist(), enemy_indices.tolist())) == expected
+        assert np.all(np.diff(segment_indices) >= 0)
+
+def test_collide_polygon_matches_brute_force():
+    rng = np.random.default_rng(8)
+    swarm = _swarm(rng, 300)
+    shape = [(0, 20), (20, 20), (10, 0), (15, 10), (5, 10)]
+    for _ in range(50):
+        position = Point(rng.uniform(0, 500), rng.uniform(0, 600))
+        previous = Point(position.x + rng.uniform(-15, 15), position.y)
+        polygon = Polygon(shape, position, 0)
+        vertices = polygon.getVertices()
+        expected = set()
+        for enemy in swarm.indices():
+            before, current = swarm.previous_positions[enemy], swarm.positions[enemy]
+            move = np.array((position.x - previous.x, position.y - previous.y))
+            local = vertices - (position.x, position.y)
+            enemy_paths = segments_hit_polygon(before + swarm.template_vertices - (previous.x, previous.y),
+                                               current + swarm.template_vertices - (position.x, position.y), local)
+            paths = segments_hit_polygon(vertices - move - before, vertices - current, swarm.template_vertices)
+            outline = segments_hit_polygon(vertices - current, np.roll(vertices, -1, axis=0) - current, swarm.template_vertices)
+            if enemy_paths.any() or paths.any() or outline.any():
+                expected.add(enemy)
+        assert set(swarm.collide_polygon(polygon, previous).tolist()) == expected